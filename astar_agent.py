@@ -0,0 +1,204 @@
+from collections import deque
+from domain import IAgent, Position, IGrid, directions
+import heapq
+from heuristics import get_heuristic
+from search_core import CellView, SearchCore
+from utils import translate
+
+
+def new_astar_agent(heuristic: str = "manhattan", move_cost: int = 0) -> IAgent:
+    return AstarAgent(heuristic, move_cost)
+
+
+class AstarAgent(IAgent):
+    """A* over the elevation cost model: entering a cell costs
+    `move_cost` plus its elevation (`move_cost=0` is the UfsAgent model).
+
+    The heuristic counts moves to the goal and is scaled by the cheapest
+    possible step, `move_cost` plus the lowest elevation of an open cell,
+    which keeps it admissible and consistent. On a grid with any elevation-0
+    floor and `move_cost=0` that scale is 0 and the search behaves like
+    UfsAgent.
+    """
+
+    _neighbor_parents = True
+    """Whether every parent is a neighbor of its cell (see SearchCore)"""
+
+    def __init__(self, heuristic: str = "manhattan", move_cost: int = 0) -> None:
+        self._heuristic = get_heuristic(heuristic)
+        self._move_cost = move_cost
+        self._prty_queue: list[tuple[float, float, int, int]] = []
+        """Entries of (f, h, counter, cell); lower h wins ties on f, then insertion order"""
+        self._cost = 0
+        """Cost from the start to the current cell"""
+        self._optimal_path: list[Position] = []
+        self._counter = 0
+        self._finished = False
+        self._found_goal = False
+
+    def set_grid(self, grid: IGrid):
+        self._grid = grid
+        self._core = SearchCore(grid, self._compact, self._neighbor_parents)
+        self._scale = self._move_cost + grid.lowest_el()
+        """Lowest possible cost of a single move"""
+        self._goal_x = self._core.goal % self._core.width
+        self._goal_y = self._core.goal // self._core.width
+        self._g: dict[int, int] = {}
+        """Best known cost from the start per discovered cell"""
+        self._current = self._core.start
+        self._push_to_queue(self._current, 0)
+
+    def _h(self, cell: int) -> float:
+        width = self._core.width
+        dx = abs(cell % width - self._goal_x)
+        dy = abs(cell // width - self._goal_y)
+        return self._scale * self._heuristic(dx, dy)
+
+    def _push_to_queue(self, cell: int, cost: int):
+        self._g[cell] = cost
+        h = self._h(cell)
+        self._counter += 1
+        heapq.heappush(self._prty_queue, (cost + h, h, self._counter, cell))
+        if self._metrics is not None:
+            self._metrics.push()
+
+    def next(self):
+        if self._finished:
+            return
+        visited = self._core.visited
+        metrics = self._metrics
+        while self._prty_queue and self._prty_queue[0][3] in visited:
+            heapq.heappop(self._prty_queue)
+            if metrics is not None:
+                metrics.pop()
+        if len(self._prty_queue) == 0:
+            self._finished = True
+            return
+        _, _, _, self._current = heapq.heappop(self._prty_queue)
+        if metrics is not None:
+            metrics.pop()
+        self._cost = self._g[self._current]
+        visited.add(self._current)
+        if self._current == self._core.goal:
+            self._find_optimal()
+            self._finished = True
+            self._found_goal = True
+            self._grid.set_finished()
+        else:
+            self._add_neighbors()
+
+    def _add_neighbors(self):
+        core = self._core
+        seen = core.seen
+        parents = core.parents
+        metrics = self._metrics
+        neighbors = core.neighbors(self._current)
+        if metrics is not None:
+            core.expanded(metrics, self._current, neighbors)
+        for neighbor in neighbors:
+            seen.add(neighbor)
+            if neighbor in core.visited or not core.is_open(neighbor):
+                if metrics is not None:
+                    core.rejected(metrics, neighbor)
+                continue
+            cost = self._cost + self._move_cost + core.els[neighbor]
+            if cost < self._g.get(neighbor, cost + 1):
+                parents[neighbor] = self._current
+                self._push_to_queue(neighbor, cost)
+            elif metrics is not None:
+                core.rejected(metrics, neighbor)
+
+    def _find_optimal(self):
+        self._optimal_path = self._core.path_to(self._current)
+
+    def run(self, max_expansions: int | None = None) -> int:
+        """`next()` unrolled into one loop over the raw planes."""
+        if self._metrics is not None or self._finished or self._core.compact:
+            return super().run(max_expansions)
+        core = self._core
+        width, size, goal = core.width, core.size, core.goal
+        steps_to, walls, els, parents = core.steps, core.walls, core.els, core.parents
+        visited, seen = core.visited.flags, core.seen.flags
+        queue, g = self._prty_queue, self._g
+        heappush, heappop = heapq.heappush, heapq.heappop
+        heuristic, scale, move_cost = self._heuristic, self._scale, self._move_cost
+        goal_x, goal_y = self._goal_x, self._goal_y
+        newly_seen = newly_visited = 0
+        counter = self._counter
+        cost, cell = self._cost, self._current
+        limit = -1 if max_expansions is None else max_expansions
+        steps = 0
+        while steps != limit:
+            steps += 1
+            while queue and visited[queue[0][3]]:
+                heappop(queue)
+            if not queue:
+                self._finished = True
+                break
+            cell = heappop(queue)[3]
+            cost = g[cell]
+            visited[cell] = 1
+            newly_visited += 1
+            if cell == goal:
+                self._current = cell
+                self._find_optimal()
+                self._finished = True
+                self._found_goal = True
+                self._grid.set_finished()
+                break
+            x = cell % width
+            for dx, offset in steps_to:
+                neighbor = cell + offset
+                if dx:
+                    if not 0 <= x + dx < width:
+                        continue
+                elif not 0 <= neighbor < size:
+                    continue
+                if not seen[neighbor]:
+                    seen[neighbor] = 1
+                    newly_seen += 1
+                if visited[neighbor] or walls[neighbor]:
+                    continue
+                step_cost = cost + move_cost + els[neighbor]
+                if step_cost < g.get(neighbor, step_cost + 1):
+                    parents[neighbor] = cell
+                    g[neighbor] = step_cost
+                    h = scale * heuristic(
+                        abs(neighbor % width - goal_x), abs(neighbor // width - goal_y)
+                    )
+                    counter += 1
+                    heappush(queue, (step_cost + h, h, counter, neighbor))
+        self._cost, self._current, self._counter = cost, cell, counter
+        core.seen.count += newly_seen
+        core.visited.count += newly_visited
+        return steps
+
+    def is_finished(self) -> bool:
+        return self._finished
+
+    def found_goal(self) -> bool:
+        return self._found_goal
+
+    def visited(self) -> CellView:
+        return CellView(self._core, self._core.visited)
+
+    def position(self) -> Position:
+        return self._core.position(self._current)
+
+    def to_explore(self) -> CellView:
+        visited = self._core.visited
+        frontier = deque(
+            dict.fromkeys(
+                cell for _, _, _, cell in self._prty_queue if cell not in visited
+            )
+        )
+        return CellView(self._core, frontier)
+
+    def neighbors(self) -> list[Position]:
+        return [translate(self.position(), direction) for direction in directions]
+
+    def seen(self) -> CellView:
+        return CellView(self._core, self._core.seen)
+
+    def optimal_path(self) -> list[Position]:
+        return self._optimal_path
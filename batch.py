@@ -0,0 +1,128 @@
+from __future__ import annotations
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+from components import ComponentIndex
+from domain import Dimensions, IGrid, Position
+from grid import Grid
+from map_format import load_map
+from solver import SolveResult, solve
+
+Query = tuple[Position, Position]
+"""(start, goal)"""
+
+_worker_grid: Grid | None = None
+"""The batch grid as seen by this worker process"""
+_worker_memory: shared_memory.SharedMemory | None = None
+_worker_components: ComponentIndex | None = None
+"""Lets a worker answer queries with no path without searching"""
+
+
+def solve_batch(
+    grid: IGrid | str,
+    queries: Sequence[Query],
+    agent_type: str = "bfs",
+    workers: int | None = None,
+    chunk_size: int = 16,
+    max_expansions: int | None = None,
+    **agent_options,
+) -> Iterator[tuple[int, SolveResult]]:
+    """Solve many start/goal queries on one grid across worker processes.
+
+    Yields (query index, result) pairs as each chunk of `chunk_size` queries
+    completes, so results arrive out of order. `grid` is never pickled:
+    either it is the path of a binary map (see `map_format.save_map`), which
+    every worker maps for itself, or its planes are copied once into shared
+    memory that the workers adopt as their planes. Workers must not edit
+    the grid. `workers` defaults to the CPU count; the other arguments are
+    as for `solver.solve`.
+    """
+    memory = None
+    if isinstance(grid, str):
+        source: tuple = ("map", grid)
+    else:
+        cells = grid.width() * grid.height()
+        memory = shared_memory.SharedMemory(create=True, size=2 * cells)
+        memory.buf[:cells] = grid.wall_plane()
+        memory.buf[cells : 2 * cells] = grid.el_plane()
+        source = (
+            "shared",
+            memory.name,
+            grid.width(),
+            grid.height(),
+            _coords(grid.start()),
+            _coords(grid.goal()),
+        )
+    pool = ProcessPoolExecutor(workers, initializer=_attach, initargs=(source,))
+    try:
+        futures = []
+        for first in range(0, len(queries), chunk_size):
+            chunk = [
+                (_coords(start), _coords(goal))
+                for start, goal in queries[first : first + chunk_size]
+            ]
+            futures.append(
+                pool.submit(
+                    _solve_chunk,
+                    first,
+                    chunk,
+                    agent_type,
+                    max_expansions,
+                    agent_options,
+                )
+            )
+        for future in as_completed(futures):
+            yield from future.result()
+    finally:
+        pool.shutdown(cancel_futures=True)
+        if memory is not None:
+            memory.close()
+            memory.unlink()
+
+
+def _coords(pos: Position) -> tuple[int, int]:
+    return pos.x_coord, pos.y_coord
+
+
+def _attach(source: tuple):
+    global _worker_grid, _worker_memory, _worker_components
+    if source[0] == "map":
+        _worker_grid = load_map(source[1])
+    else:
+        _, name, width, height, start, goal = source
+        _worker_memory = shared_memory.SharedMemory(name=name)
+        cells = width * height
+        _worker_grid = Grid(
+            Dimensions(width, height),
+            Position(*start),
+            Position(*goal),
+            [],
+            wall_plane=_worker_memory.buf[:cells],
+            el_plane=_worker_memory.buf[cells : 2 * cells],
+        )
+    _worker_components = ComponentIndex(_worker_grid)
+
+
+def _solve_chunk(
+    first: int,
+    chunk: list[tuple[tuple[int, int], tuple[int, int]]],
+    agent_type: str,
+    max_expansions: int | None,
+    agent_options: dict,
+) -> list[tuple[int, SolveResult]]:
+    return [
+        (
+            first + offset,
+            solve(
+                _worker_grid,
+                agent_type,
+                max_expansions,
+                Position(*start),
+                Position(*goal),
+                components=_worker_components,
+                **agent_options,
+            ),
+        )
+        for offset, (start, goal) in enumerate(chunk)
+    ]
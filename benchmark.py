@@ -0,0 +1,158 @@
+"""Benchmark the agents over generated maps and compare runs.
+
+    python benchmark.py --sizes 64 128 256 --out results.json
+    python benchmark.py --sizes 64 128 256 --compare results.json
+
+Every map comes from `map_generator` with a fixed seed, so two runs of the
+same command search exactly the same maps.
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import solver
+from grid import generate_random
+
+DEFAULT_AGENTS = ["bfs", "dfs", "ufs", "astar"]
+DEFAULT_SIZES = [32, 64, 128]
+DEFAULT_MAPS = ["open", "density:0.2", "density:0.35", "maze", "rooms"]
+_NOISE_SECONDS = 0.002
+"""Slowdowns smaller than this are timer noise, whatever the ratio"""
+
+
+def run_case(
+    agent_type: str, size: int, map_spec: str, seed: int, repeats: int
+) -> dict:
+    """Best-of-`repeats` timing of one agent on one map, then a separate
+    traced run for peak memory, since tracing slows the search down."""
+    kind, _, density = map_spec.partition(":")
+    options = {"wall_density": float(density)} if density else {}
+    grid = generate_random(size, size, seed, kind, **options)
+    seconds = float("inf")
+    for _ in range(repeats):
+        result = solver.solve(grid, agent_type)
+        seconds = min(seconds, result.seconds)
+    tracemalloc.start()
+    solver.solve(grid, agent_type)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "agent": agent_type,
+        "map": map_spec,
+        "size": size,
+        "found": result.found,
+        "path_length": len(result.path),
+        "path_cost": result.cost,
+        "expansions": result.expansions,
+        "seconds": seconds,
+        "expansions_per_second": result.expansions / seconds if seconds else 0.0,
+        "peak_bytes": peak_bytes,
+    }
+
+
+def run_suite(
+    agents: list[str],
+    sizes: list[int],
+    maps: list[str],
+    seed: int = 0,
+    repeats: int = 3,
+) -> dict:
+    results = []
+    for size in sizes:
+        for map_spec in maps:
+            for agent_type in agents:
+                case = run_case(agent_type, size, map_spec, seed, repeats)
+                results.append(case)
+                print(
+                    f"{agent_type:>6} {map_spec:>13} {size:>5}: "
+                    f"{case['seconds']:.4f}s "
+                    f"{case['expansions_per_second']:,.0f} exp/s "
+                    f"{case['peak_bytes'] / 2**20:.1f} MiB",
+                    file=sys.stderr,
+                )
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "repeats": repeats,
+        "results": results,
+    }
+
+
+def compare(old: dict, new: dict, tolerance: float = 0.2) -> list[str]:
+    """Regressions from `old` to `new`: a case that got more than
+    `tolerance` (a fraction) slower or hungrier, or whose answer changed."""
+    previous = {_case_key(case): case for case in old["results"]}
+    problems = []
+    for case in new["results"]:
+        key = _case_key(case)
+        before = previous.get(key)
+        if before is None:
+            continue
+        name = "{} on {} {}x{}".format(key[0], key[1], key[2], key[2])
+        for field in ("found", "path_cost", "expansions"):
+            if case[field] != before[field]:
+                problems.append(f"{name}: {field} {before[field]} -> {case[field]}")
+        slower = case["seconds"] - before["seconds"]
+        if slower > _NOISE_SECONDS and slower > before["seconds"] * tolerance:
+            problems.append(
+                f"{name}: {before['seconds']:.4f}s -> {case['seconds']:.4f}s"
+            )
+        if case["peak_bytes"] > before["peak_bytes"] * (1 + tolerance):
+            problems.append(
+                f"{name}: peak {before['peak_bytes']} -> {case['peak_bytes']} bytes"
+            )
+    return problems
+
+
+def _case_key(case: dict) -> tuple[str, str, int]:
+    return case["agent"], case["map"], case["size"]
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--agents",
+        nargs="+",
+        choices=sorted(solver.AGENT_TYPES),
+        default=DEFAULT_AGENTS,
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument(
+        "--maps",
+        nargs="+",
+        default=DEFAULT_MAPS,
+        help="map kinds, with an optional wall density as KIND:DENSITY",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--out", help="write the results as JSON to this file")
+    parser.add_argument(
+        "--compare", help="JSON results of an earlier run to check for regressions"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed slowdown or memory growth before --compare complains",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    suite = run_suite(args.agents, args.sizes, args.maps, args.seed, args.repeats)
+    suite["created"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    if args.out:
+        with open(args.out, "w") as results_file:
+            json.dump(suite, results_file, indent=2)
+    if args.compare:
+        with open(args.compare) as results_file:
+            problems = compare(json.load(results_file), suite, args.tolerance)
+        print("\n".join(problems) or "no regressions")
+        sys.exit(1 if problems else 0)
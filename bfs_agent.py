@@ -1,5 +1,5 @@
-from collections import deque
 from domain import IAgent, IGrid, Position, directions
+from search_core import CellView, Frontier, SearchCore
 from utils import translate
 
 
@@ -10,79 +10,148 @@ def new_bfs_agent() -> IAgent:
 class BfsAgent(IAgent):
 
     def __init__(self) -> None:
-        self._visited: set[Position] = set()
-        self.queue: deque[Position] = deque()
-        self.parents: dict[Position, Position] = {}
         self.shortest_path: list[Position] = []
-        self._seen: set[Position] = set()
+        self._finished = False
+        self._found_goal = False
 
     def position(self) -> Position:
-        return self._position
+        return self._core.position(self._cell)
 
     def set_grid(self, grid: IGrid):
         self.grid = grid
-        self._position = grid.start()
+        self._core = SearchCore(grid, self._compact)
+        self.queue = Frontier(self._core.new_flags())
+        self._cell = self._core.start
+        self._mark_visited(self._cell)
         self.goal = grid.goal()
 
-    def _mark_visited(self, pos: Position):
-        self._visited.add(pos)
+    def _mark_visited(self, cell: int):
+        self._core.visited.add(cell)
 
-    def _is_visited(self, pos: Position):
-        return pos in self._visited
+    def _is_visited(self, cell: int):
+        return cell in self._core.visited
 
-    def _in_queue(self, pos: Position) -> bool:
-        return pos in self.queue
+    def _in_queue(self, cell: int) -> bool:
+        return cell in self.queue
 
-    def _enqueue_cell(self, pos: Position):
-        self.queue.append(pos)
+    def _enqueue_cell(self, cell: int):
+        self.queue.append(cell)
 
-    def visited(self) -> set[Position]:
-        return self._visited
+    def visited(self) -> CellView:
+        return CellView(self._core, self._core.visited)
 
     def next(self):
+        if self._finished:
+            return
         self._add_neighbors()
-        self._position = self.queue.popleft()
-        self._mark_visited(self._position)
-        if self._position == self.grid.goal():
+        if len(self.queue) == 0:
+            self._finished = True
+            return
+        self._cell = self.queue.popleft()
+        if self._metrics is not None:
+            self._metrics.pop()
+        self._mark_visited(self._cell)
+        if self._cell == self._core.goal:
             self._shortest_path()
+            self._finished = True
+            self._found_goal = True
             self.grid.set_finished()
 
-    def to_explore(self) -> deque[Position]:
-        return self.queue
+    def run(self, max_expansions: int | None = None) -> int:
+        """`next()` unrolled into one loop over the raw planes."""
+        if self._metrics is not None or self._finished or self._core.compact:
+            return super().run(max_expansions)
+        core = self._core
+        width, size, goal = core.width, core.size, core.goal
+        steps_to, walls, parents = core.steps, core.walls, core.parents
+        visited, seen = core.visited.flags, core.seen.flags
+        queued = self.queue.members.flags
+        order = self.queue.order
+        append, popleft = order.append, order.popleft
+        newly_seen = newly_visited = 0
+        reached = False
+        cell = self._cell
+        limit = -1 if max_expansions is None else max_expansions
+        steps = 0
+        while steps != limit:
+            steps += 1
+            x = cell % width
+            for dx, offset in steps_to:
+                neighbor = cell + offset
+                if dx:
+                    if not 0 <= x + dx < width:
+                        continue
+                elif not 0 <= neighbor < size:
+                    continue
+                if not seen[neighbor]:
+                    seen[neighbor] = 1
+                    newly_seen += 1
+                if not (visited[neighbor] or queued[neighbor] or walls[neighbor]):
+                    append(neighbor)
+                    queued[neighbor] = 1
+                    parents[neighbor] = cell
+            if not order:
+                self._finished = True
+                break
+            cell = popleft()
+            queued[cell] = 0
+            if not visited[cell]:
+                visited[cell] = 1
+                newly_visited += 1
+            if cell == goal:
+                reached = True
+                break
+        self._cell = cell
+        core.seen.count += newly_seen
+        core.visited.count += newly_visited
+        self.queue.members.count = len(order)
+        if reached:
+            self._shortest_path()
+            self._finished = True
+            self._found_goal = True
+            self.grid.set_finished()
+        return steps
+
+    def is_finished(self) -> bool:
+        return self._finished
+
+    def found_goal(self) -> bool:
+        return self._found_goal
 
-    def seen(self) -> set[Position]:
-        return self._seen
+    def to_explore(self) -> CellView:
+        return CellView(self._core, self.queue)
+
+    def seen(self) -> CellView:
+        return CellView(self._core, self._core.seen)
 
     def neighbors(self) -> list[Position]:
         neighbors = []
         for direction in directions:
-            neighbor: Position = translate(self._position, direction)
+            neighbor: Position = translate(self.position(), direction)
             neighbors.append(neighbor)
         return neighbors
 
     def _add_neighbors(self) -> None:
-        for direction in directions:
-            neighbor_pos: Position = translate(self._position, direction)
-            self._seen.add(neighbor_pos)
+        seen = self._core.seen
+        parents = self._core.parents
+        metrics = self._metrics
+        neighbors = self._core.neighbors(self._cell)
+        if metrics is not None:
+            self._core.expanded(metrics, self._cell, neighbors)
+        for neighbor in neighbors:
+            seen.add(neighbor)
             if (
-                not self._is_visited(neighbor_pos) and not self._in_queue(neighbor_pos)
-            ) and (self._is_valid_pos(neighbor_pos)):
-                self._enqueue_cell(neighbor_pos)
-                self.parents[neighbor_pos] = self._position
-
-    def _is_valid_pos(self, position: Position) -> bool:
-        valid_x = 0 <= position.x_coord <= (self.grid.width() - 1)
-        valid_y = 0 <= position.y_coord <= (self.grid.height() - 1)
-        not_wall = position not in self.grid.walls()
-        return valid_x and valid_y and not_wall
+                not self._is_visited(neighbor) and not self._in_queue(neighbor)
+            ) and (self._core.is_open(neighbor)):
+                self._enqueue_cell(neighbor)
+                parents[neighbor] = self._cell
+                if metrics is not None:
+                    metrics.push()
+            elif metrics is not None:
+                self._core.rejected(metrics, neighbor)
 
     def _shortest_path(self):
-        finished = False
-        while not finished:
-            self.shortest_path.append(self.parents[self._position])
-            self._position = self.parents[self._position]
-            if self._position == self.grid.start():
-                finished = True
+        self.shortest_path = self._core.path_to(self._cell)
 
     def optimal_path(self) -> list[Position]:
         return self.shortest_path
@@ -0,0 +1,248 @@
+from abc import abstractmethod
+from collections import deque
+from domain import IAgent, Position, IGrid, directions
+import heapq
+from search_core import CellView, SearchCore
+from utils import translate
+
+FORWARD = 0
+BACKWARD = 1
+INFINITY = float("inf")
+
+
+def new_bidirectional_bfs_agent() -> IAgent:
+    return BidirectionalBfsAgent()
+
+
+def new_bidirectional_ufs_agent() -> IAgent:
+    return BidirectionalUfsAgent()
+
+
+class BidirectionalAgent(IAgent):
+    """Grows one search from the start and one from the goal, one expansion
+    per `next()` on whichever side has the smaller frontier.
+
+    Entering a cell costs `_step_cost(cell)`, so the backward search charges
+    the cell it expands from rather than the one it reaches. Every time an
+    edge joins the two searches the best meeting cost is updated, and the
+    search stops once the two frontier minimums together can no longer
+    beat it.
+    """
+
+    def __init__(self) -> None:
+        self._optimal_path: list[Position] = []
+        self._finished = False
+        self._found_goal = False
+        self._best = INFINITY
+        """Cheapest start-to-goal cost seen through a meeting edge so far"""
+        self._meeting: tuple[int, int] | None = None
+        """(forward cell, backward cell) of the edge that gave `_best`"""
+
+    def set_grid(self, grid: IGrid):
+        self._grid = grid
+        self._core = SearchCore(grid, self._compact)
+        self._closed = (self._core.new_flags(), self._core.new_flags())
+        self._dist: tuple[dict[int, float], dict[int, float]] = ({}, {})
+        self._next_hop = self._core.new_parents()
+        """Backward-search parent: the next cell on the way to the goal"""
+        self._current = self._core.start
+        self._reset_queues()
+        self._label(FORWARD, self._core.start, 0)
+        self._label(BACKWARD, self._core.goal, 0)
+
+    @abstractmethod
+    def _reset_queues(self):
+        pass
+
+    @abstractmethod
+    def _push(self, side: int, dist: float, cell: int):
+        pass
+
+    @abstractmethod
+    def _pop(self, side: int) -> int:
+        pass
+
+    @abstractmethod
+    def _top(self, side: int) -> float:
+        """Smallest distance waiting in the side's queue, or infinity."""
+        pass
+
+    @abstractmethod
+    def _queue_len(self, side: int) -> int:
+        pass
+
+    @abstractmethod
+    def _queued_cells(self, side: int) -> list[int]:
+        pass
+
+    @abstractmethod
+    def _step_cost(self, cell: int) -> int:
+        pass
+
+    def _label(self, side: int, cell: int, dist: float):
+        self._dist[side][cell] = dist
+        self._push(side, dist, cell)
+        if self._metrics is not None:
+            self._metrics.push()
+
+    def next(self):
+        if self._finished:
+            return
+        if self._top(FORWARD) + self._top(BACKWARD) >= self._best:
+            self._finish()
+            return
+        if self._queue_len(FORWARD) <= self._queue_len(BACKWARD):
+            side = FORWARD if self._queue_len(FORWARD) else BACKWARD
+        else:
+            side = BACKWARD if self._queue_len(BACKWARD) else FORWARD
+        self._current = self._pop(side)
+        if self._metrics is not None:
+            self._metrics.pop()
+        self._closed[side].add(self._current)
+        self._core.visited.add(self._current)
+        self._add_neighbors(side)
+
+    def _add_neighbors(self, side: int):
+        core = self._core
+        cell = self._current
+        dist = self._dist[side]
+        other_dist = self._dist[1 - side]
+        closed = self._closed[side]
+        base = dist[cell]
+        metrics = self._metrics
+        neighbors = core.neighbors(cell)
+        if metrics is not None:
+            core.expanded(metrics, cell, neighbors)
+        for neighbor in neighbors:
+            core.seen.add(neighbor)
+            if neighbor in closed or not core.is_open(neighbor):
+                if metrics is not None:
+                    core.rejected(metrics, neighbor)
+                continue
+            if side == FORWARD:
+                cost = base + self._step_cost(neighbor)
+            else:
+                cost = base + self._step_cost(cell)
+            if cost < dist.get(neighbor, INFINITY):
+                if side == FORWARD:
+                    core.parents[neighbor] = cell
+                else:
+                    self._next_hop[neighbor] = cell
+                self._label(side, neighbor, cost)
+            if neighbor in other_dist and cost + other_dist[neighbor] < self._best:
+                self._best = cost + other_dist[neighbor]
+                if side == FORWARD:
+                    self._meeting = (cell, neighbor)
+                else:
+                    self._meeting = (neighbor, cell)
+
+    def _finish(self):
+        self._finished = True
+        if self._meeting is None:
+            return
+        forward_cell, backward_cell = self._meeting
+        path = [backward_cell]
+        while path[-1] != self._core.goal:
+            path.append(self._next_hop[path[-1]])
+        path.reverse()
+        path.append(forward_cell)
+        while path[-1] != self._core.start:
+            path.append(self._core.parents[path[-1]])
+        # Same shape as the other agents: goal excluded, walking back to start
+        self._optimal_path = [self._core.position(cell) for cell in path[1:]]
+        self._found_goal = True
+        self._grid.set_finished()
+
+    def is_finished(self) -> bool:
+        return self._finished
+
+    def found_goal(self) -> bool:
+        return self._found_goal
+
+    def visited(self) -> CellView:
+        return CellView(self._core, self._core.visited)
+
+    def position(self) -> Position:
+        return self._core.position(self._current)
+
+    def to_explore(self) -> CellView:
+        frontier = dict.fromkeys(self._queued_cells(FORWARD))
+        frontier.update(dict.fromkeys(self._queued_cells(BACKWARD)))
+        return CellView(self._core, deque(frontier))
+
+    def neighbors(self) -> list[Position]:
+        return [translate(self.position(), direction) for direction in directions]
+
+    def seen(self) -> CellView:
+        return CellView(self._core, self._core.seen)
+
+    def optimal_path(self) -> list[Position]:
+        return self._optimal_path
+
+
+class BidirectionalBfsAgent(BidirectionalAgent):
+    """Unit step costs; each side is a FIFO queue, so labels never improve."""
+
+    def _reset_queues(self):
+        self._queues: tuple[deque[int], deque[int]] = (deque(), deque())
+
+    def _push(self, side: int, dist: float, cell: int):
+        self._queues[side].append(cell)
+
+    def _pop(self, side: int) -> int:
+        return self._queues[side].popleft()
+
+    def _top(self, side: int) -> float:
+        queue = self._queues[side]
+        return self._dist[side][queue[0]] if queue else INFINITY
+
+    def _queue_len(self, side: int) -> int:
+        return len(self._queues[side])
+
+    def _queued_cells(self, side: int) -> list[int]:
+        return list(self._queues[side])
+
+    def _step_cost(self, cell: int) -> int:
+        return 1
+
+
+class BidirectionalUfsAgent(BidirectionalAgent):
+    """Bidirectional Dijkstra over elevation costs, with UfsAgent's
+    (cost, counter, cell) heap entries and stale entries skipped on pop."""
+
+    def _reset_queues(self):
+        self._heaps: tuple[list, list] = ([], [])
+        self._counter = 0
+
+    def _push(self, side: int, dist: float, cell: int):
+        self._counter += 1
+        heapq.heappush(self._heaps[side], (dist, self._counter, cell))
+
+    def _drop_stale(self, side: int):
+        heap = self._heaps[side]
+        closed = self._closed[side]
+        dist = self._dist[side]
+        while heap and (heap[0][2] in closed or heap[0][0] > dist[heap[0][2]]):
+            heapq.heappop(heap)
+            if self._metrics is not None:
+                self._metrics.pop()
+
+    def _pop(self, side: int) -> int:
+        self._drop_stale(side)
+        return heapq.heappop(self._heaps[side])[2]
+
+    def _top(self, side: int) -> float:
+        self._drop_stale(side)
+        heap = self._heaps[side]
+        return heap[0][0] if heap else INFINITY
+
+    def _queue_len(self, side: int) -> int:
+        self._drop_stale(side)
+        return len(self._heaps[side])
+
+    def _queued_cells(self, side: int) -> list[int]:
+        closed = self._closed[side]
+        return [cell for _, _, cell in self._heaps[side] if cell not in closed]
+
+    def _step_cost(self, cell: int) -> int:
+        return self._core.els[cell]
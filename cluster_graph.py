@@ -0,0 +1,337 @@
+from __future__ import annotations
+import heapq
+import time
+from collections.abc import Iterator
+
+from domain import IGrid, Position
+from solver import SolveResult, path_cost
+
+WIDE_ENTRANCE = 6
+"""Entrances at least this wide get a transition at each end, not one in the middle"""
+
+
+class ClusterGraph:
+    """Hierarchical path-finding (HPA*) index over one grid.
+
+    The grid is cut into `cluster_size` square clusters. Wherever two
+    neighboring clusters share a run of open cells along their border, one
+    or two pairs of facing cells become transitions, and the cells in them
+    become the nodes of an abstract graph. Within each cluster the cheapest
+    cost between every two of its nodes is precomputed, staying inside the
+    cluster, under the usual cost model: entering a cell costs `move_cost`
+    plus its elevation.
+
+    `solve()` links the start and goal to the nodes of their clusters, runs
+    A* over the small abstract graph and then refines each abstract edge
+    with a search inside one cluster. Paths are not always optimal, since
+    they must pass through transitions, but come close.
+
+    The graph listens to its grid: a wall or elevation edit only marks the
+    clusters it touches, and the next query rebuilds those clusters, their
+    borders, and any neighbor whose nodes the new borders changed.
+    """
+
+    def __init__(self, grid: IGrid, cluster_size: int = 16, move_cost: int = 0):
+        if cluster_size < 2:
+            raise ValueError("Clusters must be at least 2 cells wide.")
+        self._grid = grid
+        self.cluster_size = cluster_size
+        self.move_cost = move_cost
+        self._width = grid.width()
+        self._height = grid.height()
+        self._walls = grid.wall_plane()
+        self._els = grid.el_plane()
+        self._columns = -(-self._width // cluster_size)
+        self._rows = -(-self._height // cluster_size)
+        clusters = self._columns * self._rows
+        self._transitions: dict[tuple[int, int], list[tuple[int, int]]] = {}
+        """Facing (cell, cell) pairs per border, keyed by (cluster, 0 for its
+        east border or 1 for its south border)"""
+        self._inter: dict[int, list[int]] = {}
+        """Node to the nodes facing it across a border"""
+        self._nodes: list[set[int]] = [set() for _ in range(clusters)]
+        """Abstract nodes per cluster"""
+        self._intra: dict[int, list[tuple[int, int]]] = {}
+        """Node to (node, cost) for every node of its cluster it can reach"""
+        self._dirty: set[int] = set(range(clusters))
+        """Clusters edited since the last rebuild"""
+        self.rebuilt_clusters = 0
+        self._expanded = 0
+        self._refresh()
+        grid.add_listener(self._cells_changed)
+
+    def detach(self):
+        """Stop listening to grid edits."""
+        self._grid.remove_listener(self._cells_changed)
+
+    def _cluster(self, cell: int) -> int:
+        size = self.cluster_size
+        return (cell // self._width) // size * self._columns + (
+            cell % self._width
+        ) // size
+
+    def _bounds(self, cluster: int) -> tuple[int, int, int, int]:
+        """x0, y0, x1, y1 with the ends exclusive."""
+        size = self.cluster_size
+        x0 = cluster % self._columns * size
+        y0 = cluster // self._columns * size
+        return x0, y0, min(x0 + size, self._width), min(y0 + size, self._height)
+
+    def _cells_changed(self, cells: list[int]):
+        for cell in cells:
+            self._dirty.add(self._cluster(cell))
+
+    def _borders(self, cluster: int) -> Iterator[tuple[int, int]]:
+        column, row = cluster % self._columns, cluster // self._columns
+        if column + 1 < self._columns:
+            yield cluster, 0
+        if row + 1 < self._rows:
+            yield cluster, 1
+        if column > 0:
+            yield cluster - 1, 0
+        if row > 0:
+            yield cluster - self._columns, 1
+
+    def _refresh(self):
+        if not self._dirty:
+            return
+        touched = set(self._dirty)
+        borders = {
+            border for cluster in self._dirty for border in self._borders(cluster)
+        }
+        for border in borders:
+            if self._set_transitions(border):
+                cluster, south = border
+                touched.add(cluster)
+                touched.add(cluster + (self._columns if south else 1))
+        for cluster in touched:
+            self._link_cluster(cluster)
+        self.rebuilt_clusters += len(touched)
+        self._dirty.clear()
+
+    def _set_transitions(self, border: tuple[int, int]) -> bool:
+        """Recompute one border's transitions; True if they changed."""
+        old = self._transitions.get(border, [])
+        new = self._find_transitions(border)
+        if new == old:
+            return False
+        for near, far in old:
+            self._inter[near].remove(far)
+            self._inter[far].remove(near)
+        for near, far in new:
+            self._inter.setdefault(near, []).append(far)
+            self._inter.setdefault(far, []).append(near)
+        self._transitions[border] = new
+        return True
+
+    def _find_transitions(self, border: tuple[int, int]) -> list[tuple[int, int]]:
+        cluster, south = border
+        x0, y0, x1, y1 = self._bounds(cluster)
+        width, walls = self._width, self._walls
+        if south:
+            first = (y1 - 1) * width + x0
+            stride, across, length = 1, width, x1 - x0
+        else:
+            first = y0 * width + x1 - 1
+            stride, across, length = width, 1, y1 - y0
+        transitions = []
+        run = 0
+        for step in range(length + 1):
+            near = first + step * stride
+            if step < length and not (walls[near] or walls[near + across]):
+                run += 1
+                continue
+            if run:
+                last = near - stride
+                if run >= WIDE_ENTRANCE:
+                    begin = last - (run - 1) * stride
+                    transitions.append((begin, begin + across))
+                    transitions.append((last, last + across))
+                else:
+                    middle = last - (run // 2) * stride
+                    transitions.append((middle, middle + across))
+                run = 0
+        return transitions
+
+    def _link_cluster(self, cluster: int):
+        """Recollect a cluster's nodes and the costs between them."""
+        for node in self._nodes[cluster]:
+            self._intra.pop(node, None)
+        nodes = set()
+        for border in self._borders(cluster):
+            for pair in self._transitions.get(border, ()):
+                nodes.update(cell for cell in pair if self._cluster(cell) == cluster)
+        self._nodes[cluster] = nodes
+        for node in nodes:
+            costs, _ = self._search(node, cluster, nodes)
+            self._intra[node] = [
+                (other, costs[other])
+                for other in nodes
+                if other != node and other in costs
+            ]
+
+    def _search(
+        self,
+        source: int,
+        cluster: int,
+        targets: set[int] | None = None,
+        reverse=False,
+    ) -> tuple[dict[int, int], dict[int, int]]:
+        """Dijkstra from `source` that stays inside `cluster`, stopping
+        early once every cell of `targets` is settled if given. Returns the
+        costs and parents found;
+        with `reverse` the costs are from each cell to `source`, and then
+        a step's cost belongs to the cell being left."""
+        x0, y0, x1, y1 = self._bounds(cluster)
+        width, walls, els, move_cost = (
+            self._width,
+            self._walls,
+            self._els,
+            self.move_cost,
+        )
+        costs = {source: 0}
+        parents: dict[int, int] = {}
+        queue = [(0, 0, source)]
+        counter = expanded = 0
+        left = len(targets) if targets else -1
+        while queue:
+            cost, _, cell = heapq.heappop(queue)
+            if cost > costs[cell]:
+                continue
+            expanded += 1
+            if left > 0 and cell in targets:
+                left -= 1
+                if not left:
+                    break
+            x, y = cell % width, cell // width
+            leaving = cost + move_cost + els[cell]
+            for neighbor, inside in (
+                (cell + 1, x + 1 < x1),
+                (cell - 1, x > x0),
+                (cell + width, y + 1 < y1),
+                (cell - width, y > y0),
+            ):
+                if not inside or walls[neighbor]:
+                    continue
+                step = leaving if reverse else cost + move_cost + els[neighbor]
+                known = costs.get(neighbor)
+                if known is None or step < known:
+                    costs[neighbor] = step
+                    parents[neighbor] = cell
+                    counter += 1
+                    heapq.heappush(queue, (step, counter, neighbor))
+        self._expanded += expanded
+        return costs, parents
+
+    def solve(
+        self, start: Position | None = None, goal: Position | None = None
+    ) -> SolveResult:
+        """Plan from `start` to `goal` (the grid's own by default), first
+        rebuilding any clusters edited since the last query. `expansions`
+        counts the abstract nodes and the cells expanded along the way."""
+        began = time.perf_counter()
+        self._expanded = 0
+        self._refresh()
+        start = start or self._grid.start()
+        goal = goal or self._grid.goal()
+        start_cell = start.y_coord * self._width + start.x_coord
+        goal_cell = goal.y_coord * self._width + goal.x_coord
+        path: list[Position] = []
+        if start_cell == goal_cell:
+            path = [start]
+        elif not (self._walls[start_cell] or self._walls[goal_cell]):
+            route = self._abstract_route(start_cell, goal_cell)
+            if route is not None:
+                path = self._refine(route)
+        return SolveResult(
+            "hpa",
+            bool(path),
+            path,
+            path_cost(self._grid, path, self.move_cost),
+            self._expanded,
+            time.perf_counter() - began,
+        )
+
+    def _abstract_route(self, start: int, goal: int) -> list[int] | None:
+        """A* over the abstract graph, with the start and goal linked in
+        for this query only; returns the cells it passes, start to goal."""
+        start_cluster, goal_cluster = self._cluster(start), self._cluster(goal)
+        costs, _ = self._search(start, start_cluster)
+        start_arcs = [
+            (node, costs[node])
+            for node in self._nodes[start_cluster]
+            if node != start and node in costs
+        ]
+        if start_cluster == goal_cluster and goal in costs:
+            start_arcs.append((goal, costs[goal]))
+        costs, _ = self._search(goal, goal_cluster, reverse=True)
+        goal_arcs = {
+            node: costs[node]
+            for node in self._nodes[goal_cluster]
+            if node != goal and node in costs
+        }
+        width, els, move_cost = self._width, self._els, self.move_cost
+        goal_x, goal_y = goal % width, goal // width
+        g = {start: 0}
+        parents: dict[int, int] = {}
+        closed = set()
+        queue = [(0, 0, start)]
+        counter = 0
+        while queue:
+            _, _, node = heapq.heappop(queue)
+            if node in closed:
+                continue
+            closed.add(node)
+            self._expanded += 1
+            if node == goal:
+                route = [goal]
+                while node != start:
+                    node = parents[node]
+                    route.append(node)
+                route.reverse()
+                return route
+            arcs = list(self._intra.get(node, ()))
+            arcs.extend(
+                (other, move_cost + els[other]) for other in self._inter.get(node, ())
+            )
+            if node == start:
+                arcs.extend(start_arcs)
+            if node in goal_arcs:
+                arcs.append((goal, goal_arcs[node]))
+            for other, cost in arcs:
+                step = g[node] + cost
+                if other not in closed and step < g.get(other, step + 1):
+                    g[other] = step
+                    parents[other] = node
+                    h = move_cost * (
+                        abs(other % width - goal_x) + abs(other // width - goal_y)
+                    )
+                    counter += 1
+                    heapq.heappush(queue, (step + h, counter, other))
+        return None
+
+    def _refine(self, route: list[int]) -> list[Position]:
+        width = self._width
+        cells = [route[0]]
+        for here, there in zip(route, route[1:]):
+            cluster = self._cluster(here)
+            if cluster != self._cluster(there):
+                cells.append(there)
+                continue
+            _, parents = self._search(here, cluster, {there})
+            leg = []
+            cell = there
+            while cell != here:
+                leg.append(cell)
+                cell = parents[cell]
+            cells.extend(reversed(leg))
+        return [Position(cell % width, cell // width) for cell in cells]
+
+    def stats(self) -> dict:
+        return {
+            "clusters": len(self._nodes),
+            "nodes": len(self._intra),
+            "edges": sum(len(arcs) for arcs in self._intra.values())
+            + sum(len(others) for others in self._inter.values()),
+            "rebuilt_clusters": self.rebuilt_clusters,
+        }
@@ -0,0 +1,171 @@
+from __future__ import annotations
+from array import array
+from collections import deque
+
+from domain import IGrid, Position
+
+WALL = 0
+"""Label of wall cells, which belong to no component"""
+
+
+class ComponentIndex:
+    """Connected components of the open cells of one grid, so that
+    `connected(start, goal)` answers in near-constant time whether any path
+    exists.
+
+    Built in one pass over the wall plane: each row is cut into runs of
+    open cells, runs that touch a run in the row above are merged in a
+    union-find, and every cell is labelled with its run's root. The index
+    listens to its grid and keeps up with wall edits as they happen. Opening
+    a cell merges the components around it. Closing one starts a search
+    from each open neighbor in turn; searches that meet are merged, and any
+    that runs dry before meeting the rest has found a piece that was cut
+    off, which gets a new label. A wall that splits nothing costs only the
+    detour around it.
+    """
+
+    def __init__(self, grid: IGrid):
+        self._grid = grid
+        self._width = grid.width()
+        self._height = grid.height()
+        self._size = self._width * self._height
+        self._walls = grid.wall_plane()
+        self._parents: list[int] = [WALL]
+        """Union-find parent per label; a label that is its own parent is a
+        component"""
+        self._labels = array("i", bytes(4 * self._size))
+        """Label per cell, WALL for walls"""
+        self._build()
+        grid.add_listener(self._cells_changed)
+
+    def detach(self):
+        """Stop listening to grid edits."""
+        self._grid.remove_listener(self._cells_changed)
+
+    def _build(self):
+        width, parents, labels = self._width, self._parents, self._labels
+        runs: list[tuple[int, int, int]] = []
+        """(first cell, end cell, label) per run of open cells"""
+        above: list[tuple[int, int, int]] = []
+        for row in range(0, self._size, width):
+            line = bytes(self._walls[row : row + width])
+            current = []
+            begin = line.find(0)
+            while begin != -1:
+                end = line.find(1, begin)
+                if end == -1:
+                    end = width
+                label = len(parents)
+                parents.append(label)
+                current.append((row + begin, row + end, label))
+                begin = line.find(0, end)
+            # Runs in both rows are in order, so walk them side by side and
+            # merge every pair that overlaps by at least one column.
+            upper = 0
+            for first, end, label in current:
+                while upper < len(above) and above[upper][1] + width <= first:
+                    upper += 1
+                touching = upper
+                while touching < len(above) and above[touching][0] + width < end:
+                    self._union(above[touching][2], label)
+                    touching += 1
+            runs.extend(current)
+            above = current
+        for first, end, label in runs:
+            labels[first:end] = array("i", [self._find(label)]) * (end - first)
+
+    def _find(self, label: int) -> int:
+        parents = self._parents
+        while parents[label] != label:
+            parents[label] = parents[parents[label]]
+            label = parents[label]
+        return label
+
+    def _union(self, label: int, other: int):
+        root, other_root = self._find(label), self._find(other)
+        if root != other_root:
+            self._parents[other_root] = root
+
+    def _open_neighbors(self, cell: int) -> list[int]:
+        width, labels = self._width, self._labels
+        x = cell % width
+        neighbors = []
+        if x > 0 and labels[cell - 1]:
+            neighbors.append(cell - 1)
+        if x + 1 < width and labels[cell + 1]:
+            neighbors.append(cell + 1)
+        if cell >= width and labels[cell - width]:
+            neighbors.append(cell - width)
+        if cell + width < self._size and labels[cell + width]:
+            neighbors.append(cell + width)
+        return neighbors
+
+    def _cells_changed(self, cells: list[int]):
+        walls, labels = self._walls, self._labels
+        for cell in cells:
+            if walls[cell] and labels[cell] != WALL:
+                self._close(cell)
+            elif not walls[cell] and labels[cell] == WALL:
+                self._open(cell)
+
+    def _open(self, cell: int):
+        label = len(self._parents)
+        self._parents.append(label)
+        self._labels[cell] = label
+        for neighbor in self._open_neighbors(cell):
+            self._union(label, self._labels[neighbor])
+
+    def _close(self, cell: int):
+        self._labels[cell] = WALL
+        starts = self._open_neighbors(cell)
+        if len(starts) < 2:
+            return
+        owners = {start: search for search, start in enumerate(starts)}
+        """Cell to the search that reached it first"""
+        merged = list(range(len(starts)))
+        """Search to the search it was merged into, itself if none"""
+        queues = [deque([start]) for start in starts]
+        members = [[start] for start in starts]
+        active = list(range(len(starts)))
+        while len(active) > 1:
+            for search in list(active):
+                if merged[search] != search:
+                    continue
+                queue = queues[search]
+                if not queue:
+                    # Ran dry without meeting the others: a separate piece.
+                    label = len(self._parents)
+                    self._parents.append(label)
+                    for member in members[search]:
+                        self._labels[member] = label
+                    active.remove(search)
+                    if len(active) == 1:
+                        break
+                    continue
+                for neighbor in self._open_neighbors(queue.popleft()):
+                    owner = owners.get(neighbor)
+                    if owner is None:
+                        owners[neighbor] = search
+                        queue.append(neighbor)
+                        members[search].append(neighbor)
+                        continue
+                    while merged[owner] != owner:
+                        owner = merged[owner]
+                    if owner != search:
+                        merged[owner] = search
+                        queue.extend(queues[owner])
+                        members[search].extend(members[owner])
+                        active.remove(owner)
+            active = [search for search in active if merged[search] == search]
+
+    def component(self, pos: Position) -> int:
+        """Component label of `pos`, WALL for a wall; labels change as the
+        grid is edited."""
+        if not (0 <= pos.x_coord < self._width and 0 <= pos.y_coord < self._height):
+            raise ValueError(f"Position out of grid bounds: {pos}")
+        return self._find(self._labels[pos.y_coord * self._width + pos.x_coord])
+
+    def connected(self, a: Position, b: Position) -> bool:
+        """Whether a path between `a` and `b` exists."""
+        label = self.component(a)
+        return label != WALL and label == self.component(b)
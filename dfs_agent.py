@@ -1,5 +1,5 @@
 from domain import IAgent, Position, IGrid, directions
-from collections import deque
+from search_core import CellView, Frontier, SearchCore
 from utils import translate
 
 
@@ -9,86 +9,155 @@ def new_dfs_agent() -> IAgent:
 
 class DfsAgent(IAgent):
     def __init__(self) -> None:
-        self._visited: set[Position] = set()
-        self._stack: deque[Position] = deque()
-        self._path: list[Position] = []
-        self._seen: set[Position] = set()
-        self._parents: dict[Position, Position] = {}
+        self._path: list[int] = []
         self._optimal_path: list[Position] = []
+        self._finished = False
+        self._found_goal = False
 
     def set_grid(self, grid: IGrid):
         self.grid = grid
-        self._position = grid.start()
+        self._core = SearchCore(grid, self._compact)
+        self._stack = Frontier(self._core.new_flags())
+        self._cell = self._core.start
 
     def position(self) -> Position:
-        return self._position
+        return self._core.position(self._cell)
 
-    def visited(self) -> set[Position]:
-        return self._visited
+    def visited(self) -> CellView:
+        return CellView(self._core, self._core.visited)
 
-    def to_explore(self) -> deque[Position]:
-        return self._stack
+    def to_explore(self) -> CellView:
+        return CellView(self._core, self._stack)
 
     def _mark_visited(self):
-        self._visited.add(self._position)
+        self._core.visited.add(self._cell)
 
-    def _push_stack(self, pos: Position):
-        self._stack.append(pos)
+    def _push_stack(self, cell: int):
+        self._stack.append(cell)
 
     def _pop_stack(self):
-        self._position = self._stack.pop()
-        self._path.append(self._position)
+        self._cell = self._stack.pop()
+        self._path.append(self._cell)
+        if self._metrics is not None:
+            self._metrics.pop()
 
     def next(self):
+        if self._finished:
+            return
         if len(self._stack) > 0:
             self._pop_stack()
-        if self._position == self.grid.goal():
+        elif self._is_visited(self._cell):
+            self._finished = True
+            return
+        if self._cell == self._core.goal:
             self._find_optimal()
+            self._finished = True
+            self._found_goal = True
             self.grid.set_finished()
         self._mark_visited()
         self._add_neighbors()
 
-    def seen(self) -> set[Position]:
-        return self._seen
+    def run(self, max_expansions: int | None = None) -> int:
+        """`next()` unrolled into one loop over the raw planes."""
+        if self._metrics is not None or self._finished or self._core.compact:
+            return super().run(max_expansions)
+        core = self._core
+        width, size, goal = core.width, core.size, core.goal
+        steps_to, walls, parents = core.steps, core.walls, core.parents
+        visited, seen = core.visited.flags, core.seen.flags
+        stacked = self._stack.members.flags
+        order = self._stack.order
+        push, pop = order.append, order.pop
+        path_append = self._path.append
+        newly_seen = newly_visited = 0
+        cell = self._cell
+        limit = -1 if max_expansions is None else max_expansions
+        steps = 0
+        while steps != limit:
+            steps += 1
+            if order:
+                cell = pop()
+                stacked[cell] = 0
+                path_append(cell)
+            elif visited[cell]:
+                self._finished = True
+                break
+            if cell == goal:
+                self._cell = cell
+                self._find_optimal()
+                self._finished = True
+                self._found_goal = True
+                self.grid.set_finished()
+            if not visited[cell]:
+                visited[cell] = 1
+                newly_visited += 1
+            x = cell % width
+            for dx, offset in steps_to:
+                neighbor = cell + offset
+                if dx:
+                    if not 0 <= x + dx < width:
+                        continue
+                elif not 0 <= neighbor < size:
+                    continue
+                if not seen[neighbor]:
+                    seen[neighbor] = 1
+                    newly_seen += 1
+                if not (visited[neighbor] or walls[neighbor] or stacked[neighbor]):
+                    parents[neighbor] = cell
+                    push(neighbor)
+                    stacked[neighbor] = 1
+            if self._finished:
+                break
+        self._cell = cell
+        core.seen.count += newly_seen
+        core.visited.count += newly_visited
+        self._stack.members.count = len(order)
+        return steps
+
+    def is_finished(self) -> bool:
+        return self._finished
+
+    def found_goal(self) -> bool:
+        return self._found_goal
+
+    def seen(self) -> CellView:
+        return CellView(self._core, self._core.seen)
 
     def neighbors(self) -> list[Position]:
         neighbors = []
         for direction in directions:
-            neighbor: Position = translate(self._position, direction)
+            neighbor: Position = translate(self.position(), direction)
             neighbors.append(neighbor)
         return neighbors
 
     def optimal_path(self) -> list[Position]:
         return self._optimal_path
 
-    def _in_stack(self, pos: Position) -> bool:
-        return pos in self._stack
+    def _in_stack(self, cell: int) -> bool:
+        return cell in self._stack
 
     def _add_neighbors(self) -> None:
-        for direction in directions:
-            nghbr: Position = translate(self._position, direction)
-            self._seen.add(nghbr)
+        seen = self._core.seen
+        parents = self._core.parents
+        metrics = self._metrics
+        neighbors = self._core.neighbors(self._cell)
+        if metrics is not None:
+            self._core.expanded(metrics, self._cell, neighbors)
+        for nghbr in neighbors:
+            seen.add(nghbr)
             is_visited = self._is_visited(nghbr)
-            is_valid = self.grid.is_valid(nghbr)
+            is_valid = self._core.is_open(nghbr)
             in_stack = self._in_stack(nghbr)
             if (not is_visited) and is_valid and (not in_stack):
-                self._parents[nghbr] = self._position
+                parents[nghbr] = self._cell
                 self._push_stack(nghbr)
+                if metrics is not None:
+                    metrics.push()
+            elif metrics is not None:
+                self._core.rejected(metrics, nghbr)
 
     def _find_optimal(self):
-        finished = False
-        while not finished:
-            print("stuck finding optimal. position: ", self._position)
-            self._optimal_path.append(self._parents[self._position])
-            self._position = self._parents[self._position]
-            if self._position == self.grid.start():
-                finished = True
-
-    def _is_visited(self, pos: Position):
-        return pos in self._visited
-
-    def _is_valid_pos(self, position: Position) -> bool:
-        valid_x = 0 <= position.x_coord <= (self.grid.width() - 1)
-        valid_y = 0 <= position.y_coord <= (self.grid.height() - 1)
-        not_wall = position not in self.grid.walls()
-        return valid_x and valid_y and not_wall
+        self._optimal_path = self._core.path_to(self._cell)
+
+    def _is_visited(self, cell: int):
+        return cell in self._core.visited
@@ -0,0 +1,157 @@
+from __future__ import annotations
+import heapq
+import struct
+import sys
+from array import array
+
+from domain import IGrid, Position, directions
+
+UNREACHABLE = -1
+NO_HOP = 255
+
+_MAGIC = b"DFLD"
+_HEADER = struct.Struct("<4sHIIIIi")
+"""magic, format version, width, height, goal x, goal y, move cost"""
+_FORMAT_VERSION = 1
+
+
+class DistanceField:
+    """Cost-to-goal and next hop for every cell, for one fixed goal.
+
+    `distances` holds the cheapest cost from each cell to the goal
+    (UNREACHABLE for walls and cut-off cells) under the grid cost model:
+    entering a cell costs `move_cost` plus its elevation. `next_hops` holds,
+    per cell, the index into `domain.directions` of the step toward the
+    goal (NO_HOP where there is none). Build one with `build()`; after that
+    `path_from()` is a table walk as long as the path itself.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        goal: Position,
+        move_cost: int,
+        distances: array,
+        next_hops: bytearray,
+    ):
+        self.width = width
+        self.height = height
+        self.goal = goal
+        self.move_cost = move_cost
+        self.distances = distances
+        self.next_hops = next_hops
+
+    @classmethod
+    def build(
+        cls, grid: IGrid, goal: Position | None = None, move_cost: int = 0
+    ) -> DistanceField:
+        """One reverse Dijkstra from the goal over the whole grid.
+
+        Walking backward, a step's cost belongs to the cell being left, not
+        the one reached, so labels can improve after first discovery; stale
+        heap entries are skipped on pop.
+        """
+        goal = goal or grid.goal()
+        width, height = grid.width(), grid.height()
+        size = width * height
+        walls = grid.wall_plane()
+        els = grid.el_plane()
+        distances = array("i", [UNREACHABLE]) * size
+        next_hops = bytearray([NO_HOP]) * size
+        # Stepping from a neighbor into `cell` moves opposite to the offset
+        # used to find that neighbor, so record the reverse direction.
+        steps = []
+        for dx, dy in directions:
+            back = directions.index((-dx, -dy))
+            steps.append((dx, dy * width + dx, back))
+        goal_cell = goal.y_coord * width + goal.x_coord
+        distances[goal_cell] = 0
+        queue = [(0, 0, goal_cell)]
+        counter = 0
+        while queue:
+            dist, _, cell = heapq.heappop(queue)
+            if dist > distances[cell]:
+                continue
+            step_in = dist + move_cost + els[cell]
+            x = cell % width
+            for dx, offset, back in steps:
+                if dx and not 0 <= x + dx < width:
+                    continue
+                neighbor = cell + offset
+                if not 0 <= neighbor < size or walls[neighbor]:
+                    continue
+                known = distances[neighbor]
+                if known == UNREACHABLE or step_in < known:
+                    distances[neighbor] = step_in
+                    next_hops[neighbor] = back
+                    counter += 1
+                    heapq.heappush(queue, (step_in, counter, neighbor))
+        return cls(width, height, goal, move_cost, distances, next_hops)
+
+    def _cell(self, pos: Position) -> int:
+        if not (0 <= pos.x_coord < self.width and 0 <= pos.y_coord < self.height):
+            raise IndexError(f"Position out of field bounds: {pos}")
+        return pos.y_coord * self.width + pos.x_coord
+
+    def distance(self, start: Position) -> int | None:
+        dist = self.distances[self._cell(start)]
+        return None if dist == UNREACHABLE else dist
+
+    def path_from(self, start: Position) -> list[Position]:
+        """Start to goal inclusive, or empty if the goal is unreachable."""
+        cell = self._cell(start)
+        if self.distances[cell] == UNREACHABLE:
+            return []
+        offsets = [dy * self.width + dx for dx, dy in directions]
+        goal_cell = self._cell(self.goal)
+        path = [start]
+        while cell != goal_cell:
+            cell += offsets[self.next_hops[cell]]
+            path.append(Position(cell % self.width, cell // self.width))
+        return path
+
+    def to_bytes(self) -> bytes:
+        distances = self.distances
+        if sys.byteorder != "little":
+            distances = array("i", distances)
+            distances.byteswap()
+        header = _HEADER.pack(
+            _MAGIC,
+            _FORMAT_VERSION,
+            self.width,
+            self.height,
+            self.goal.x_coord,
+            self.goal.y_coord,
+            self.move_cost,
+        )
+        return header + distances.tobytes() + bytes(self.next_hops)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> DistanceField:
+        magic, version, width, height, goal_x, goal_y, move_cost = _HEADER.unpack_from(
+            data
+        )
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            raise ValueError("Not a distance field, or an unsupported version.")
+        size = width * height
+        distances = array("i")
+        end = _HEADER.size + size * distances.itemsize
+        distances.frombytes(data[_HEADER.size : end])
+        if sys.byteorder != "little":
+            distances.byteswap()
+        next_hops = bytearray(data[end : end + size])
+        if len(next_hops) != size:
+            raise ValueError("Distance field data is truncated.")
+        return cls(
+            width, height, Position(goal_x, goal_y), move_cost, distances, next_hops
+        )
+
+    def save(self, path: str):
+        with open(path, "wb") as field_file:
+            field_file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> DistanceField:
+        with open(path, "rb") as field_file:
+            return cls.from_bytes(field_file.read())
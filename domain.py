@@ -1,7 +1,8 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from collections import deque
-from collections.abc import Iterable
+from collections.abc import Callable, Collection, Iterable, Set
+
+from metrics import SearchMetrics
 
 
 Direction = tuple[int, int]
@@ -20,6 +21,9 @@ COLOR_NORM = "\033[0m"
 
 directions: Directions = [UP, DOWN, LEFT, RIGHT]
 
+GridListener = Callable[[list[int]], None]
+"""Receives the row-major cell ids (y * width + x) touched by a grid edit"""
+
 
 class Position:
     def __init__(self, x_coord, y_coord):
@@ -52,6 +56,49 @@ class Dimensions:
 
 
 class IAgent(ABC):
+    _metrics: SearchMetrics | None = None
+    """Search counters while instrumented; agents skip all counting when None"""
+    _compact = False
+    """Whether the agent's SearchCore is bit-packed"""
+    _move_cost = 0
+    """Cost of each step on top of the elevation of the cell entered"""
+
+    def instrument(
+        self, on_expand: Callable[[Position], None] | None = None
+    ) -> SearchMetrics:
+        """Start counting this agent's search events, with an optional
+        callback per expanded cell. Call before the agent gets a grid."""
+        self._metrics = SearchMetrics(on_expand)
+        return self._metrics
+
+    def metrics(self) -> SearchMetrics | None:
+        return self._metrics
+
+    def move_cost(self) -> int:
+        return self._move_cost
+
+    def compact(self):
+        """Keep this agent's search state bit-packed (see SearchCore), for
+        grids too large for a byte per cell. Saves memory at the cost of
+        the unrolled `run()` loops. Call before the agent gets a grid."""
+        self._compact = True
+
+    def run(self, max_expansions: int | None = None) -> int:
+        """Call `next()` until the agent finishes, or `max_expansions` times;
+        returns the number of calls. Agents may override this with a tighter
+        loop that must leave them exactly as the same `next()` calls would.
+        """
+        metrics = self._metrics
+        steps = 0
+        while not self.is_finished():
+            if max_expansions is not None and steps >= max_expansions:
+                break
+            if metrics is None:
+                self.next()
+            else:
+                metrics.time_step(self.next)
+            steps += 1
+        return steps
 
     @abstractmethod
     def next(self):
@@ -62,7 +109,7 @@ class IAgent(ABC):
         pass
 
     @abstractmethod
-    def visited(self) -> set[Position]:
+    def visited(self) -> Set[Position]:
         pass
 
     @abstractmethod
@@ -70,7 +117,7 @@ class IAgent(ABC):
         pass
 
     @abstractmethod
-    def to_explore(self) -> deque[Position]:
+    def to_explore(self) -> Collection[Position]:
         pass
 
     @abstractmethod
@@ -82,7 +129,16 @@ class IAgent(ABC):
         pass
 
     @abstractmethod
-    def seen(self) -> set[Position]:
+    def seen(self) -> Set[Position]:
+        pass
+
+    @abstractmethod
+    def is_finished(self) -> bool:
+        """True once the goal is reached or there is nothing left to explore."""
+        pass
+
+    @abstractmethod
+    def found_goal(self) -> bool:
         pass
 
 
@@ -106,6 +162,7 @@ class IGrid(ABC):
 
     @abstractmethod
     def set_finished(self):
+        """Called by an agent that reaches the goal; other agents go on."""
         pass
 
     @abstractmethod
@@ -116,12 +173,19 @@ class IGrid(ABC):
     def add_agent(self, agent: IAgent):
         pass
 
+    @abstractmethod
+    def agents(self) -> list[IAgent]:
+        """The agents added so far, in order; not to be modified."""
+        pass
+
     @abstractmethod
     def is_finished(self) -> bool:
+        """True once every agent has finished."""
         pass
 
     @abstractmethod
-    def move_agents(self):
+    def move_agents(self, steps: int = 1):
+        """Step every unfinished agent up to `steps` times."""
         pass
 
     @abstractmethod
@@ -143,3 +207,36 @@ class IGrid(ABC):
     @abstractmethod
     def is_valid(self, pos: Position) -> bool:
         pass
+
+    @abstractmethod
+    def is_wall(self, pos: Position) -> bool:
+        pass
+
+    @abstractmethod
+    def set_wall(self, pos: Position, is_wall: bool = True):
+        pass
+
+    @abstractmethod
+    def add_listener(self, listener: GridListener):
+        pass
+
+    @abstractmethod
+    def remove_listener(self, listener: GridListener):
+        pass
+
+    @abstractmethod
+    def version(self) -> int:
+        pass
+
+    @abstractmethod
+    def lowest_el(self) -> int:
+        """Lowest elevation of any open cell, 0 if every cell is a wall."""
+        pass
+
+    @abstractmethod
+    def wall_plane(self) -> bytearray | memoryview:
+        pass
+
+    @abstractmethod
+    def el_plane(self) -> bytearray | memoryview:
+        pass
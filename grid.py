@@ -1,15 +1,20 @@
 from __future__ import annotations
 from bfs_agent import BfsAgent
 from domain import (
+    GridListener,
     IAgent,
     IGrid,
     Position,
     Dimensions,
     COLOR_NORM,
 )
+from map_generator import generate_planes
+from search_core import BitFlags, CellFlags, CellView, Frontier
 from utils import int_input_with_limits, translate
 
 import domain
+import sys
+from collections.abc import Iterable
 
 from enum import Enum
 
@@ -74,7 +79,13 @@ class Grid(domain.IGrid):
         start: Position,
         goal: Position,
         walls: list[Position],
+        *,
+        wall_plane: bytearray | memoryview | None = None,
+        el_plane: bytearray | memoryview | None = None,
     ):
+        """`wall_plane` and `el_plane` (see below) can be passed in to adopt
+        existing buffers, such as views into a mapped file, without copying;
+        walls listed in `walls` are added to them."""
         self._dimensions = dimensions
         self._start = start
         assert start not in walls, "Start cannot be on a wall."
@@ -86,29 +97,93 @@ class Grid(domain.IGrid):
         assert 0 <= self._goal.y_coord <= (dimensions.height - 1)
         assert start != goal
         self._agents: list[IAgent] = []
-        self._walls: list[Position] = walls
+        self._listeners: list[GridListener] = []
+        """Called with the cell ids of every wall or elevation edit"""
         self._finished = False
-        self.el_map: list[list[int]] = [
-            [0 for _ in range(self._dimensions.width)]
-            for _ in range(self._dimensions.height)
-        ]
+        self._version = 0
+        """Bumped on every wall or elevation edit"""
+        self._lowest_el = (-1, 0)
+        """(version, result) of the last `lowest_el()`"""
+        cells = dimensions.width * dimensions.height
+        self._wall_plane = bytearray(cells) if wall_plane is None else wall_plane
+        """Row-major wall flags, one byte per cell (index y * width + x)"""
+        self._el_plane = bytearray(cells) if el_plane is None else el_plane
+        """Row-major elevation, one byte per cell (index y * width + x)"""
+        assert len(self._wall_plane) == len(self._el_plane) == cells
+        for wall in walls:
+            self._wall_plane[self._index(wall)] = 1
+        assert not self._wall_plane[self._index(start)], "Start cannot be on a wall."
+        assert not self._wall_plane[self._index(goal)], "Goal cannot be on a wall."
+
+    def _index(self, pos: Position) -> int:
+        if not (
+            0 <= pos.x_coord < self._dimensions.width
+            and 0 <= pos.y_coord < self._dimensions.height
+        ):
+            raise IndexError(f"Position out of grid bounds: {pos}")
+        return pos.y_coord * self._dimensions.width + pos.x_coord
 
     def get_el(self, pos: Position) -> int:
-        return self.el_map[pos.x_coord][pos.y_coord]
+        return self._el_plane[self._index(pos)]
 
     def set_el(self, pos: Position, el: int):
-        self.el_map[pos.x_coord][pos.y_coord] = el
+        index = self._index(pos)
+        self._el_plane[index] = el
+        self._notify([index])
 
     def set_els(self, pos1: Position, pos2: Position, el):
         x_start, x_end = min(pos1.x_coord, pos2.x_coord), max(
-            pos1.x_coord, pos1.x_coord
+            pos1.x_coord, pos2.x_coord
         )
         y_start, y_end = min(pos1.y_coord, pos2.y_coord), max(
             pos1.y_coord, pos2.y_coord
         )
-        for x in range(x_start, x_end + 1):
-            for y in range(y_start, y_end + 1):
-                self.set_el(Position(x, y), el)
+        self._index(Position(x_start, y_start))
+        self._index(Position(x_end, y_end))
+        row_fill = bytes([el]) * (x_end - x_start + 1)
+        width = self._dimensions.width
+        changed: list[int] = []
+        for y in range(y_start, y_end + 1):
+            row = y * width
+            self._el_plane[row + x_start : row + x_end + 1] = row_fill
+            if self._listeners:
+                changed.extend(range(row + x_start, row + x_end + 1))
+        self._notify(changed)
+
+    def set_wall(self, pos: Position, is_wall: bool = True):
+        if is_wall and (pos == self._start or pos == self._goal):
+            raise ValueError("Start and goal cannot be walls.")
+        index = self._index(pos)
+        self._wall_plane[index] = int(is_wall)
+        self._notify([index])
+
+    def add_listener(self, listener: GridListener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: GridListener):
+        self._listeners.remove(listener)
+
+    def _notify(self, cells: list[int]):
+        self._version += 1
+        for listener in self._listeners:
+            listener(cells)
+
+    def version(self) -> int:
+        return self._version
+
+    def lowest_el(self) -> int:
+        """Lowest elevation of any open cell, 0 if every cell is a wall;
+        found once per grid version."""
+        if self._lowest_el[0] != self._version:
+            el = _lowest_open_el(self._wall_plane, self._el_plane)
+            self._lowest_el = (self._version, el)
+        return self._lowest_el[1]
+
+    def el_plane(self) -> bytearray | memoryview:
+        return self._el_plane
+
+    def wall_plane(self) -> bytearray | memoryview:
+        return self._wall_plane
 
     def start(self):
         return self._start
@@ -126,92 +201,437 @@ class Grid(domain.IGrid):
         self._agents.append(agent)
         agent.set_grid(self)
 
-    def move_agents(self):
-        for agent in self._agents:
-            agent.next()
+    def agents(self) -> list[IAgent]:
+        return self._agents
+
+    def move_agents(self, steps: int = 1):
+        step_agents(self._agents, steps)
 
     def set_finished(self):
         self._finished = True
 
     def is_finished(self) -> bool:
-        return self._finished
+        return agents_finished(self._agents, self._finished)
 
     def walls(self) -> list[Position]:
-        return self._walls
+        width = self._dimensions.width
+        return [
+            Position(index % width, index // width)
+            for index, is_wall in enumerate(self._wall_plane)
+            if is_wall
+        ]
+
+    def is_wall(self, pos: Position) -> bool:
+        return self._wall_plane[self._index(pos)] == 1
 
     def is_valid(self, pos: Position) -> bool:
         valid_x = 0 <= pos.x_coord <= (self._dimensions.width - 1)
         valid_y = 0 <= pos.y_coord <= (self._dimensions.height - 1)
-        not_wall = pos not in self._walls
-        return valid_x and valid_y and not_wall
-
-    def _color(self, pos: Position, char: str) -> str:
-        if (
-            char == PositionChar.DEFAULT.value
-            or char == PositionChar.QUEUE.value
-            or char == PositionChar.VISITED.value
-        ):
-            el = self.get_el(pos)
-            return elevation_mapping[el].value
+        if not (valid_x and valid_y):
+            return False
+        return not self._wall_plane[pos.y_coord * self._dimensions.width + pos.x_coord]
+
+    def render(self) -> None:
+        sys.stdout.write(FrameRenderer(self).frame())
+        sys.stdout.flush()
+
+
+def _lowest_open_el(walls: bytearray | memoryview, els: bytearray | memoryview) -> int:
+    # Raise every wall to elevation 255 with whole-plane big-integer
+    # operations, then search the result for each elevation from 0 up.
+    size = len(els)
+    raised = int.from_bytes(walls, "little") * 0xFF
+    if raised == (1 << 8 * size) - 1:
+        return 0
+    open_els = (int.from_bytes(els, "little") | raised).to_bytes(size, "little")
+    return next((el for el in range(255) if el in open_els), 255)
+
+
+def step_agents(agents: list[IAgent], steps: int = 1):
+    """One scheduler tick: each agent that has not finished gets up to
+    `steps` calls to `next()`, taking turns in the order they were added.
+    An agent that finishes drops out; the others keep going."""
+    for agent in agents:
+        agent.run(steps)
+
+
+def agents_finished(agents: list[IAgent], goal_reached: bool) -> bool:
+    """A grid is finished once every agent on it is; with no agents, once
+    `set_finished()` has been called."""
+    if not agents:
+        return goal_reached
+    return all(agent.is_finished() for agent in agents)
+
+
+_LAYERS = [
+    PositionChar.DEFAULT,
+    PositionChar.QUEUE,
+    PositionChar.VISITED,
+    PositionChar.PATH,
+    PositionChar.AGENT,
+    PositionChar.WALL,
+    PositionChar.START,
+    PositionChar.GOAL,
+]
+"""Glyph codes by index; a higher code is painted over a lower one"""
+_QUEUE, _VISITED, _PATH, _AGENT, _WALL, _START, _GOAL = range(1, 8)
+_CELL_COLUMNS = 3
+"""Each cell is drawn as its character followed by two spaces"""
+
+
+def _char_color(char: PositionChar) -> str:
+    if char == PositionChar.AGENT:
+        return ObjectColor.AGENT.value
+    if char == PositionChar.GOAL:
+        return ObjectColor.GOAL.value
+    if char == PositionChar.START:
+        return ObjectColor.START.value
+    if char == PositionChar.WALL:
+        return ObjectColor.WALL.value
+    if char == PositionChar.PATH:
+        return ObjectColor.PATH.value
+    raise ValueError
+
+
+class FrameRenderer:
+    """Draws a grid and its agents, either as whole frames or as
+    cursor-addressed updates of only the cells that changed.
+
+    Each frame is reduced to a plane of glyph codes (one byte per cell)
+    painted from the agents' views, so the cost per frame is proportional
+    to what the agents have touched rather than to a per-cell scan of
+    every view. The output is built into one string and written once.
+    """
+
+    def __init__(self, grid: IGrid):
+        """`grid` is a Grid or QueryGrid: the renderer reads its agents."""
+        self._grid = grid
+        self._glyphs: dict[tuple[int, int], str] = {}
+        self._last_codes: bytearray | None = None
+        self._last_els: bytes = b""
+        self._last_top = 0
+
+    def _glyph(self, code: int, el: int) -> str:
+        glyph = self._glyphs.get((code, el))
+        if glyph is None:
+            char = _LAYERS[code]
+            if code in (0, _QUEUE, _VISITED):
+                color = elevation_mapping[el].value
+            else:
+                color = _char_color(char)
+            glyph = f"{color}{char.value}{COLOR_NORM}  "
+            self._glyphs[(code, el)] = glyph
+        return glyph
+
+    def _cells(self, positions: Iterable[Position]) -> Iterable[int]:
+        if isinstance(positions, CellView):
+            return positions.cells()
+        width = self._grid.width()
+        return (pos.y_coord * width + pos.x_coord for pos in positions)
+
+    def codes(self) -> bytearray:
+        """Glyph code per cell, with the same precedence as the original
+        per-cell checks: goal, start, wall, then each agent in order
+        (position, path, visited, frontier), all hidden until seen by the
+        first agent."""
+        grid = self._grid
+        width = grid.width()
+        agents = grid.agents()
+        codes = bytearray(width * grid.height())
+        if not agents:
+            return codes
+        layers = bytearray(len(codes))
+        for agent in reversed(agents):
+            for code, positions in (
+                (_QUEUE, agent.to_explore()),
+                (_VISITED, agent.visited()),
+                (_PATH, agent.optimal_path()),
+            ):
+                for cell in self._cells(positions):
+                    layers[cell] = code
+            layers[self._index(agent.position())] = _AGENT
+        walls = grid.wall_plane()
+        if isinstance(walls, memoryview):
+            walls = walls.tobytes()
+        cell = walls.find(1)
+        while cell != -1:
+            layers[cell] = _WALL
+            cell = walls.find(1, cell + 1)
+        layers[self._index(grid.start())] = _START
+        layers[self._index(grid.goal())] = _GOAL
+        for cell in self._cells(agents[0].seen()):
+            codes[cell] = layers[cell]
+        return codes
+
+    def _index(self, pos: Position) -> int:
+        return pos.y_coord * self._grid.width() + pos.x_coord
+
+    def _source(self, positions: Iterable[Position]) -> bytearray | BitFlags | set[int]:
+        """A flag plane or bitset to scan if the view has one, else a set of
+        cell ids."""
+        if isinstance(positions, CellView):
+            cells = positions.cells()
+            if isinstance(cells, Frontier):
+                cells = cells.members
+            if isinstance(cells, CellFlags):
+                return cells.flags
+            if isinstance(cells, BitFlags):
+                return cells
+        return set(self._cells(positions))
+
+    def window(
+        self, columns: int, rows: int, scale: int = 1, center: Position | None = None
+    ) -> str:
+        """A `columns` x `rows` glyph window, blank line above and below.
+
+        With `scale` 1 the window shows the cells around `center` (default:
+        the first agent's position) exactly as `frame()` would. With a
+        larger `scale` each glyph stands for a `scale` x `scale` block: it
+        takes the highest elevation in the block and the most important
+        thing found there, in the order goal, start, agent, path, wall,
+        visited, frontier. Flag planes are scanned a block row at a time, so
+        the work follows the window, not the grid.
+        """
+        grid = self._grid
+        width, height = grid.width(), grid.height()
+        agents = grid.agents()
+        columns = min(columns, -(-width // scale))
+        rows = min(rows, -(-height // scale))
+        if center is None:
+            center = agents[0].position() if agents else grid.start()
+        span_x, span_y = columns * scale, rows * scale
+        x0 = max(0, min(center.x_coord - span_x // 2, width - span_x))
+        y0 = max(0, min(center.y_coord - span_y // 2, height - span_y))
+
+        def tester(source: bytearray | BitFlags | set[int]):
+            if isinstance(source, BitFlags):
+                return lambda block, ranges: any(
+                    source.any_between(a, b) for a, b in ranges
+                )
+            if not isinstance(source, set):
+                return lambda block, ranges: any(any(source[a:b]) for a, b in ranges)
+            hits = set()
+            for cell in source:
+                x, y = cell % width - x0, cell // width - y0
+                if 0 <= x < span_x and 0 <= y < span_y:
+                    hits.add(y // scale * columns + x // scale)
+            return lambda block, ranges: block in hits
+
+        layers = [
+            (_GOAL, tester({self._index(grid.goal())})),
+            (_START, tester({self._index(grid.start())})),
+        ]
+        agent_layers = [
+            (
+                agent,
+                tester({self._index(agent.position())}),
+                tester(self._source(agent.optimal_path())),
+                tester(self._source(agent.visited())),
+                tester(self._source(agent.to_explore())),
+            )
+            for agent in agents
+        ]
+        walls = (_WALL, tester(grid.wall_plane()))
+        if scale == 1:
+            layers.append(walls)
+            for _, position, path, visited, queue in agent_layers:
+                layers += [
+                    (_AGENT, position),
+                    (_PATH, path),
+                    (_VISITED, visited),
+                    (_QUEUE, queue),
+                ]
         else:
-            return self._char_color(char)
-
-    def _char_color(self, char: str) -> str:
-        if char == PositionChar.AGENT.value:
-            return ObjectColor.AGENT.value
-        if char == PositionChar.GOAL.value:
-            return ObjectColor.GOAL.value
-        if char == PositionChar.START.value:
-            return ObjectColor.START.value
-        if char == PositionChar.WALL.value:
-            return ObjectColor.WALL.value
-        if char == PositionChar.PATH.value:
-            return ObjectColor.PATH.value
-        raise ValueError
-
-    def _print_position(self, color: str, char: str):
-        padding = 2
-        gap_str = " " * padding
-        print(
-            f"{color}{char}{COLOR_NORM}",
-            end=gap_str,
-        )
+            layers += [(_AGENT, layer[1]) for layer in agent_layers]
+            layers += [(_PATH, layer[2]) for layer in agent_layers]
+            layers.append(walls)
+            layers += [(_VISITED, layer[3]) for layer in agent_layers]
+            layers += [(_QUEUE, layer[4]) for layer in agent_layers]
+        seen = tester(self._source(agents[0].seen())) if agents else None
+        els = grid.el_plane()
+        out = ["\n"]
+        for block_y in range(rows):
+            top = y0 + block_y * scale
+            bottom = min(top + scale, height)
+            for block_x in range(columns):
+                left = x0 + block_x * scale
+                right = min(left + scale, width)
+                ranges = [
+                    (row * width + left, row * width + right)
+                    for row in range(top, bottom)
+                ]
+                block = block_y * columns + block_x
+                el = max(max(els[a:b]) for a, b in ranges)
+                code = 0
+                if seen is not None and seen(block, ranges):
+                    for layer_code, test in layers:
+                        if test(block, ranges):
+                            code = layer_code
+                            break
+                out.append(self._glyph(code, el))
+            out.append("\n")
+        out.append("\n")
+        return "".join(out)
+
+    def frame(self) -> str:
+        """The whole grid, with a blank line above and below."""
+        return self._frame(self.codes(), self._grid.el_plane())
+
+    def _frame(self, codes: bytearray, els: bytes | bytearray) -> str:
+        width = self._grid.width()
+        glyph = self._glyph
+        rows = ["\n"]
+        for row in range(0, len(codes), width):
+            rows.append(
+                "".join(glyph(codes[i], els[i]) for i in range(row, row + width))
+            )
+            rows.append("\n")
+        rows.append("\n")
+        return "".join(rows)
+
+    def diff(self, top: int = 1) -> str:
+        """ANSI updates turning the previously drawn frame into the current
+        one, for a frame whose blank first line sits on terminal row `top`.
+
+        The first call, or a call with a different `top`, draws everything.
+        """
+        codes = self.codes()
+        els = bytes(self._grid.el_plane())
+        last_codes, last_els = self._last_codes, self._last_els
+        full = last_codes is None or top != self._last_top
+        self._last_codes, self._last_els, self._last_top = codes, els, top
+        if full:
+            return f"\033[{top};1H" + self._frame(codes, els)
+        width = self._grid.width()
+        glyph = self._glyph
+        out = []
+        for row in range(0, len(codes), width):
+            end = row + width
+            if (
+                codes[row:end] == last_codes[row:end]
+                and els[row:end] == last_els[row:end]
+            ):
+                continue
+            line = top + 1 + row // width
+            for cell in range(row, end):
+                if codes[cell] != last_codes[cell] or els[cell] != last_els[cell]:
+                    column = 1 + (cell - row) * _CELL_COLUMNS
+                    out.append(f"\033[{line};{column}H")
+                    out.append(glyph(codes[cell], els[cell]))
+        return "".join(out)
+
+    def height(self) -> int:
+        return self._grid.height()
+
+    def draw(self, top: int = 1):
+        sys.stdout.write(self.diff(top))
+        sys.stdout.flush()
+
+
+class QueryGrid(domain.IGrid):
+    """A grid seen with a different start and goal.
+
+    Walls, elevations, listeners and version all come from the wrapped grid;
+    agents, the finished flag and the endpoints belong to the query, so
+    several queries can search one grid without disturbing each other.
+    """
+
+    def __init__(self, grid: IGrid, start: Position, goal: Position):
+        for pos in (start, goal):
+            if not (
+                0 <= pos.x_coord < grid.width() and 0 <= pos.y_coord < grid.height()
+            ):
+                raise ValueError(f"Position out of grid bounds: {pos}")
+            if grid.is_wall(pos):
+                raise ValueError(f"Start and goal cannot be walls: {pos}")
+        self._grid = grid
+        self._start = start
+        self._goal = goal
+        self._agents: list[IAgent] = []
+        self._finished = False
+
+    def start(self) -> Position:
+        return self._start
+
+    def goal(self) -> Position:
+        return self._goal
+
+    def width(self) -> int:
+        return self._grid.width()
+
+    def height(self) -> int:
+        return self._grid.height()
+
+    def set_finished(self):
+        self._finished = True
 
-    def _char(self, pos: Position) -> str:
-        if pos in self._agents[0].seen():
-            if pos == self._goal:
-                return PositionChar.GOAL.value
-            if pos == self._start:
-                return PositionChar.START.value
-            if pos in self._walls:
-                return PositionChar.WALL.value
-            for agent in self._agents:
-                if pos == agent.position():
-                    return PositionChar.AGENT.value
-                if pos in agent.optimal_path():
-                    return PositionChar.PATH.value
-                if pos in agent.visited():
-                    return PositionChar.VISITED.value
-                if pos in agent.to_explore():
-                    return PositionChar.QUEUE.value
-        return PositionChar.DEFAULT.value
+    def is_finished(self) -> bool:
+        return agents_finished(self._agents, self._finished)
+
+    def walls(self) -> list[Position]:
+        return self._grid.walls()
+
+    def add_agent(self, agent: IAgent):
+        self._agents.append(agent)
+        agent.set_grid(self)
+
+    def agents(self) -> list[IAgent]:
+        return self._agents
+
+    def move_agents(self, steps: int = 1):
+        step_agents(self._agents, steps)
 
     def render(self) -> None:
-        print()
-        for row in range(self._dimensions.height):
-            for column in range(self._dimensions.width):
-                curr_pos = Position(column, row)
-                char = self._char(curr_pos)
-                color = self._color(curr_pos, char)
-                self._print_position(color, char)
-            print()
-        print()
+        sys.stdout.write(FrameRenderer(self).frame())
+        sys.stdout.flush()
+
+    def get_el(self, pos: Position) -> int:
+        return self._grid.get_el(pos)
+
+    def set_el(self, pos: Position, el: int):
+        self._grid.set_el(pos, el)
+
+    def set_els(self, pos1: Position, pos2: Position, el: int):
+        self._grid.set_els(pos1, pos2, el)
+
+    def is_valid(self, pos: Position) -> bool:
+        return self._grid.is_valid(pos)
+
+    def is_wall(self, pos: Position) -> bool:
+        return self._grid.is_wall(pos)
+
+    def set_wall(self, pos: Position, is_wall: bool = True):
+        if is_wall and (pos == self._start or pos == self._goal):
+            raise ValueError("Start and goal cannot be walls.")
+        self._grid.set_wall(pos, is_wall)
+
+    def add_listener(self, listener: GridListener):
+        self._grid.add_listener(listener)
+
+    def remove_listener(self, listener: GridListener):
+        self._grid.remove_listener(listener)
+
+    def version(self) -> int:
+        return self._grid.version()
+
+    def lowest_el(self) -> int:
+        return self._grid.lowest_el()
+
+    def wall_plane(self) -> bytearray | memoryview:
+        return self._grid.wall_plane()
+
+    def el_plane(self) -> bytearray | memoryview:
+        return self._grid.el_plane()
+
+
+MAX_INPUT_SIZE = 4096
+"""Larger grids are best watched through FrameRenderer.window()"""
 
 
 def user_input_grid() -> domain.IGrid:
     """Get input via command line for grid dimensions, start position and goal position."""
-    width = int_input_with_limits(0, 50, "Enter grid width: ")
-    height = int_input_with_limits(0, 50, "Enter grid height: ")
+    width = int_input_with_limits(0, MAX_INPUT_SIZE, "Enter grid width: ")
+    height = int_input_with_limits(0, MAX_INPUT_SIZE, "Enter grid height: ")
     dimensions = Dimensions(width, height)
     start_x = int_input_with_limits(
         0, dimensions.width - 1, "Enter starting x coordinate: "
@@ -242,8 +662,54 @@ def user_input_grid() -> domain.IGrid:
     return Grid(dimensions, start, goal, walls)
 
 
-def generate_random() -> tuple[Dimensions, Position, Position]:
-    raise NotImplementedError
+def grid_from_text(text: str) -> Grid:
+    """Build a grid from rows of characters.
+
+    "#" is a wall, "S" the start, "G" the goal, "." or " " open floor and a
+    digit 0-5 open floor at that elevation. Blank lines are ignored.
+    """
+    rows = [line.rstrip("\n") for line in text.splitlines() if line.strip()]
+    if not rows:
+        raise ValueError("Grid text is empty.")
+    width = max(len(row) for row in rows)
+    start = goal = None
+    walls: list[Position] = []
+    elevations: list[tuple[Position, int]] = []
+    for y, row in enumerate(rows):
+        for x, char in enumerate(row.ljust(width)):
+            pos = Position(x, y)
+            if char == PositionChar.WALL.value:
+                walls.append(pos)
+            elif char == PositionChar.START.value:
+                start = pos
+            elif char == PositionChar.GOAL.value:
+                goal = pos
+            elif char.isdigit() and int(char) in elevation_mapping:
+                elevations.append((pos, int(char)))
+            elif char not in (".", " "):
+                raise ValueError(f"Unknown grid character {char!r} at {pos}")
+    if start is None or goal is None:
+        raise ValueError("Grid text needs a start (S) and a goal (G).")
+    grid = Grid(Dimensions(width, len(rows)), start, goal, walls)
+    for pos, el in elevations:
+        grid.set_el(pos, el)
+    return grid
+
+
+def load_grid(path: str) -> Grid:
+    with open(path) as grid_file:
+        return grid_from_text(grid_file.read())
+
+
+def generate_random(
+    width: int, height: int, seed: int | None = None, kind: str = "rooms", **options
+) -> Grid:
+    """A seeded procedural grid; see `map_generator.generate_planes` for
+    the kinds and options."""
+    dimensions, start, goal, walls, els = generate_planes(
+        width, height, seed, kind, **options
+    )
+    return Grid(dimensions, start, goal, [], wall_plane=walls, el_plane=els)
 
 
 def hard_coded_grid() -> IGrid:
@@ -288,6 +754,6 @@ def create_mountain(grid: IGrid, center_pos: Position, max_height=3):
         y_end = cy + elevation
 
         # Set the elevation for all points within this boundary to the current elevation
-        for x in range(x_start, x_end + 1):
-            for y in range(y_start, y_end + 1):
-                grid.set_els(Position(x, y), Position(x, y), max_height - elevation)
+        grid.set_els(
+            Position(x_start, y_start), Position(x_end, y_end), max_height - elevation
+        )
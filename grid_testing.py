@@ -0,0 +1,27 @@
+"""Helpers shared by the test modules."""
+
+import random
+from collections.abc import Iterator
+
+import grid
+from domain import IGrid, Position
+from map_generator import MAP_KINDS
+
+
+def random_grids(count: int) -> Iterator[grid.Grid]:
+    """Seeded procedural grids of every kind and assorted sizes."""
+    for seed in range(count):
+        r = random.Random(seed)
+        yield grid.generate_random(
+            r.randint(5, 40), r.randint(5, 40), seed, MAP_KINDS[seed % len(MAP_KINDS)]
+        )
+
+
+def check_path(g: IGrid, path: list[Position]):
+    """Assert the path is a walk of open neighbors from start to goal."""
+    assert path[0] == g.start() and path[-1] == g.goal()
+    for here, there in zip(path, path[1:]):
+        assert (
+            abs(here.x_coord - there.x_coord) + abs(here.y_coord - there.y_coord) == 1
+        )
+        assert g.is_valid(there)
@@ -0,0 +1,35 @@
+from collections.abc import Callable
+
+Heuristic = Callable[[int, int], float]
+"""Lower bound on the number of moves between two cells, given |dx| and |dy|"""
+
+OCTILE_DIAGONAL = 2**0.5 - 1
+
+
+def manhattan(dx: int, dy: int) -> float:
+    return dx + dy
+
+
+def octile(dx: int, dy: int) -> float:
+    """Never larger than manhattan, so also admissible on the 4-connected grid."""
+    return max(dx, dy) + OCTILE_DIAGONAL * min(dx, dy)
+
+
+def zero(dx: int, dy: int) -> float:
+    return 0
+
+
+HEURISTICS: dict[str, Heuristic] = {
+    "manhattan": manhattan,
+    "octile": octile,
+    "zero": zero,
+}
+
+
+def get_heuristic(name: str) -> Heuristic:
+    try:
+        return HEURISTICS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown heuristic {name!r}, expected one of {sorted(HEURISTICS)}"
+        ) from None
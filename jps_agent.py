@@ -0,0 +1,237 @@
+from bisect import bisect_left, bisect_right
+
+from astar_agent import AstarAgent
+from domain import IAgent, directions
+from search_core import SearchCore
+
+
+def new_jps_agent(heuristic: str = "manhattan", move_cost: int = 1) -> IAgent:
+    return JpsAgent(heuristic, move_cost)
+
+
+class JpsAgent(AstarAgent):
+    """Jump Point Search for the 4-connected grid, on top of AstarAgent's
+    cost model and queue.
+
+    A cell is flat when every open neighbor shares its elevation. From a
+    flat cell the search jumps in straight lines over flat cells and only
+    stops at the goal, at a cell with a forced neighbor (a wall hides the
+    cell beside it), at a non-flat cell, or, when moving vertically, where
+    a sideways jump would find any of those. Non-flat cells are expanded
+    to their immediate neighbors like a normal A*, because there a detour
+    through a neighboring cell need not cost the same as the straight path.
+
+    Unlike AstarAgent, `move_cost` defaults to 1: on elevation-0 floor a
+    zero move cost makes every path equally cheap, leaving nothing for the
+    jumps to prune and no distance for the heuristic to guide by.
+    """
+
+    _neighbor_parents = False
+
+    def __init__(self, heuristic: str = "manhattan", move_cost: int = 1) -> None:
+        super().__init__(heuristic, move_cost)
+        self._rows: dict[int, _Row] = {}
+        """Jump stops per row, computed on first use"""
+        self._rows_version = -1
+        """Grid version `_rows` was computed for"""
+
+    def run(self, max_expansions: int | None = None) -> int:
+        # AstarAgent's unrolled loop expands plain neighbors, not jumps.
+        return IAgent.run(self, max_expansions)
+
+    def _is_open(self, x: int, y: int) -> bool:
+        core = self._core
+        return (
+            0 <= x < core.width
+            and 0 <= y < core.height
+            and not core.walls[y * core.width + x]
+        )
+
+    def _row(self, y: int) -> "_Row":
+        row = self._rows.get(y)
+        if row is None:
+            row = self._rows[y] = _Row(self._core, y)
+        return row
+
+    def _is_flat(self, cell: int) -> bool:
+        width = self._core.width
+        return cell % width not in self._row(cell // width).bumpy
+
+    def _add_neighbors(self):
+        if self._grid.version() != self._rows_version:
+            self._rows.clear()
+            self._rows_version = self._grid.version()
+        core = self._core
+        cell = self._current
+        parent = core.parents[cell]
+        metrics = self._metrics
+        if parent == -1 or not self._is_flat(cell):
+            neighbors = core.neighbors(cell)
+            if metrics is not None:
+                core.expanded(metrics, cell, neighbors)
+            for neighbor in neighbors:
+                core.seen.add(neighbor)
+                if core.is_open(neighbor):
+                    self._relax(neighbor, self._move_cost + core.els[neighbor])
+                elif metrics is not None:
+                    core.rejected(metrics, neighbor)
+            return
+        if metrics is not None:
+            # jumps replace the neighbor scan, so there are no rejections to count
+            core.expanded(metrics, cell, core.neighbors(cell))
+        width = core.width
+        back_x = _sign(parent % width - cell % width)
+        back_y = _sign(parent // width - cell // width)
+        for dx, dy in directions:
+            if (dx, dy) == (back_x, back_y):
+                continue
+            jump_point, cost = self._jump(cell, dx, dy)
+            if jump_point != -1:
+                self._relax(jump_point, cost)
+
+    def _relax(self, cell: int, step_cost: int):
+        if cell in self._core.visited:
+            return
+        cost = self._cost + step_cost
+        if cost < self._g.get(cell, cost + 1):
+            self._core.parents[cell] = self._current
+            self._push_to_queue(cell, cost)
+
+    def _jump(self, cell: int, dx: int, dy: int) -> tuple[int, int]:
+        """Walk from `cell` in direction (dx, dy); return the jump point and
+        the cost of reaching it, or (-1, 0) if the walk hits a wall or edge."""
+        core = self._core
+        if dx:
+            jump_point = self._jump_across(cell, dx)
+            if jump_point == -1:
+                return -1, 0
+            first, end = min(cell + dx, jump_point), max(cell + dx, jump_point) + 1
+            return jump_point, (end - first) * self._move_cost + sum(
+                core.els[first:end]
+            )
+        is_open = self._is_open
+        width, walls = core.width, core.walls
+        x, y = cell % width, cell // width
+        cost = 0
+        while True:
+            y += dy
+            if not 0 <= y < core.height or walls[y * width + x]:
+                return -1, 0
+            cell = y * width + x
+            core.seen.add(cell)
+            cost += self._move_cost + core.els[cell]
+            if cell == core.goal or x in self._row(y).bumpy:
+                return cell, cost
+            if (is_open(x - 1, y) and not is_open(x - 1, y - dy)) or (
+                is_open(x + 1, y) and not is_open(x + 1, y - dy)
+            ):
+                return cell, cost
+            if self._jump_across(cell, 1) != -1 or self._jump_across(cell, -1) != -1:
+                return cell, cost
+
+    def _jump_across(self, cell: int, dx: int) -> int:
+        """The jump point of a horizontal walk from `cell`, or -1; found by
+        bisecting the row's stops rather than stepping, though every cell
+        walked is still marked seen."""
+        core = self._core
+        width = core.width
+        y, x = divmod(cell, width)
+        row = self._row(y)
+        first = y * width
+        if dx > 0:
+            wall = row.walls.find(1, x + 1)
+            if wall == -1:
+                wall = width
+            index = bisect_right(row.east, x)
+            stop = row.east[index] if index < len(row.east) else width
+            if stop < wall:
+                core.seen.add_range(cell + 1, first + stop + 1)
+                return first + stop
+            core.seen.add_range(cell + 1, first + wall)
+            return -1
+        wall = row.walls.rfind(1, 0, x)
+        index = bisect_left(row.west, x) - 1
+        stop = row.west[index] if index >= 0 else -1
+        if stop > wall:
+            core.seen.add_range(first + stop, cell)
+            return first + stop
+        core.seen.add_range(first + wall + 1, cell)
+        return -1
+
+    def _find_optimal(self):
+        """Parent chain back to the start, filling in the straight runs
+        between consecutive jump points."""
+        core = self._core
+        width = core.width
+        path = []
+        cell = self._current
+        while cell != core.start:
+            parent = core.parents[cell]
+            step = _sign(parent % width - cell % width) + width * _sign(
+                parent // width - cell // width
+            )
+            while cell != parent:
+                cell += step
+                path.append(core.position(cell))
+        self._optimal_path = path
+
+
+def _sign(value: int) -> int:
+    return (value > 0) - (value < 0)
+
+
+class _Row:
+    """Where horizontal jumps through one grid row stop, in x coordinates.
+
+    A jump stops at the goal, at a bumpy cell (an open neighbor has
+    another elevation), or at a cell with a forced neighbor, which depends
+    on the direction. Walls end a jump without a stop. The forced neighbors
+    come from byte searches over the neighboring rows' walls, and rows
+    sharing one elevation are found flat without a per-cell loop.
+    """
+
+    def __init__(self, core: SearchCore, y: int) -> None:
+        width = core.width
+        first = y * width
+        self.walls = bytes(core.walls[first : first + width])
+        els = bytes(core.els[first : first + width])
+        self.bumpy: set[int] = set()
+        east: set[int] = set()
+        west: set[int] = set()
+        if els.count(els[0]) != width:
+            for x in range(width - 1):
+                if els[x] != els[x + 1]:
+                    if not self.walls[x + 1]:
+                        self.bumpy.add(x)
+                    if not self.walls[x]:
+                        self.bumpy.add(x + 1)
+        for other in (y - 1, y + 1):
+            if not 0 <= other < core.height:
+                continue
+            other_walls = bytes(core.walls[other * width : (other + 1) * width])
+            other_els = bytes(core.els[other * width : (other + 1) * width])
+            if other_els != els:
+                for x in range(width):
+                    if other_els[x] != els[x] and not other_walls[x]:
+                        self.bumpy.add(x)
+            # Forced neighbors: the cell beside the walk is open but the
+            # one behind it is a wall or off the grid.
+            if not other_walls[0]:
+                east.add(0)
+            x = other_walls.find(b"\x01\x00")
+            while x != -1:
+                east.add(x + 1)
+                x = other_walls.find(b"\x01\x00", x + 1)
+            if not other_walls[-1]:
+                west.add(width - 1)
+            x = other_walls.find(b"\x00\x01")
+            while x != -1:
+                west.add(x)
+                x = other_walls.find(b"\x00\x01", x + 1)
+        if core.goal // width == y:
+            east.add(core.goal % width)
+            west.add(core.goal % width)
+        self.east = sorted(east | self.bumpy)
+        """Stops of eastward jumps"""
+        self.west = sorted(west | self.bumpy)
+        """Stops of westward jumps"""
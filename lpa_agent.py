@@ -0,0 +1,198 @@
+from collections import deque
+from domain import IAgent, Position, IGrid, directions
+import heapq
+from search_core import CellView, SearchCore
+from utils import translate
+
+INFINITY = float("inf")
+
+
+def new_lpa_agent(move_cost: int = 1) -> IAgent:
+    return LpaAgent(move_cost)
+
+
+class LpaAgent(IAgent):
+    """Lifelong Planning A*: keeps its search state across grid edits.
+
+    The agent listens to its grid; every wall or elevation edit re-checks
+    only the edited cells and their neighbors and reopens the search, and
+    the following `next()` calls repair just the part of the cost-from-start
+    map that the edit made stale. Entering a cell costs `move_cost` plus
+    its elevation. The heuristic is Manhattan distance times `move_cost`,
+    which stays admissible whatever the edits do to elevations.
+
+    `move_cost` must be at least 1: LPA* traces its path back by following
+    the lowest cost-from-start, which can loop between zero-cost cells.
+    """
+
+    def __init__(self, move_cost: int = 1) -> None:
+        if move_cost < 1:
+            raise ValueError("LpaAgent needs a move_cost of at least 1.")
+        self._move_cost = move_cost
+        self._prty_queue: list[tuple[float, float, int, int]] = []
+        """Entries of (key1, key2, counter, cell); only entries matching `_keys` are live"""
+        self._keys: dict[int, tuple[float, float]] = {}
+        """Current queue key per inconsistent cell"""
+        self._g: dict[int, float] = {}
+        """Settled cost from the start, infinite when absent"""
+        self._rhs: dict[int, float] = {}
+        """One-step lookahead cost from the start, infinite when absent"""
+        self._optimal_path: list[Position] = []
+        self._counter = 0
+        self._finished = False
+        self._found_goal = False
+
+    def set_grid(self, grid: IGrid):
+        self._grid = grid
+        self._core = SearchCore(grid, self._compact)
+        self._goal_x = self._core.goal % self._core.width
+        self._goal_y = self._core.goal // self._core.width
+        self._current = self._core.start
+        self._rhs[self._core.start] = 0
+        self._insert(self._core.start)
+        grid.add_listener(self._cells_changed)
+
+    def detach(self):
+        """Stop listening to grid edits."""
+        self._grid.remove_listener(self._cells_changed)
+
+    def _h(self, cell: int) -> float:
+        width = self._core.width
+        dx = abs(cell % width - self._goal_x)
+        dy = abs(cell // width - self._goal_y)
+        return self._move_cost * (dx + dy)
+
+    def _key(self, cell: int) -> tuple[float, float]:
+        best = min(self._g.get(cell, INFINITY), self._rhs.get(cell, INFINITY))
+        return (best + self._h(cell), best)
+
+    def _insert(self, cell: int):
+        key = self._key(cell)
+        self._keys[cell] = key
+        self._counter += 1
+        heapq.heappush(self._prty_queue, (key[0], key[1], self._counter, cell))
+        if self._metrics is not None:
+            self._metrics.push()
+
+    def _top_key(self) -> tuple[float, float]:
+        queue = self._prty_queue
+        while queue and self._keys.get(queue[0][3]) != queue[0][:2]:
+            heapq.heappop(queue)
+            if self._metrics is not None:
+                self._metrics.pop()
+        return queue[0][:2] if queue else (INFINITY, INFINITY)
+
+    def _update_vertex(self, cell: int):
+        core = self._core
+        if cell != core.start:
+            rhs = INFINITY
+            if not core.walls[cell]:
+                g = self._g
+                best = min(
+                    (
+                        g.get(neighbor, INFINITY)
+                        for neighbor in core.neighbors(cell)
+                        if not core.walls[neighbor]
+                    ),
+                    default=INFINITY,
+                )
+                rhs = best + self._move_cost + core.els[cell]
+            self._rhs[cell] = rhs
+        self._keys.pop(cell, None)
+        if self._g.get(cell, INFINITY) != self._rhs.get(cell, INFINITY):
+            self._insert(cell)
+
+    def _cells_changed(self, cells: list[int]):
+        core = self._core
+        for cell in cells:
+            self._update_vertex(cell)
+            for neighbor in core.neighbors(cell):
+                self._update_vertex(neighbor)
+        self._finished = False
+        self._found_goal = False
+
+    def next(self):
+        if self._finished:
+            return
+        goal = self._core.goal
+        top = self._top_key()
+        if not (
+            top < self._key(goal)
+            or self._rhs.get(goal, INFINITY) != self._g.get(goal, INFINITY)
+        ):
+            self._finish()
+            return
+        cell = heapq.heappop(self._prty_queue)[3]
+        del self._keys[cell]
+        neighbors = self._core.neighbors(cell)
+        if self._metrics is not None:
+            self._metrics.pop()
+            self._core.expanded(self._metrics, cell, neighbors)
+        self._current = cell
+        self._core.visited.add(cell)
+        rhs = self._rhs.get(cell, INFINITY)
+        if self._g.get(cell, INFINITY) > rhs:
+            self._g[cell] = rhs
+        else:
+            self._g.pop(cell, None)
+            self._update_vertex(cell)
+        for neighbor in neighbors:
+            self._core.seen.add(neighbor)
+            self._update_vertex(neighbor)
+
+    def replan(self) -> int:
+        """Run until the cost map is consistent again; returns the expansions."""
+        expansions = 0
+        while not self._finished:
+            self.next()
+            expansions += 1
+        return expansions
+
+    def _finish(self):
+        self._finished = True
+        self._optimal_path = []
+        core = self._core
+        if self._g.get(core.goal, INFINITY) == INFINITY:
+            return
+        self._optimal_path = [core.position(cell) for cell in self._walk_back()]
+        self._found_goal = True
+        self._grid.set_finished()
+
+    def _walk_back(self) -> list[int]:
+        """Step from the goal to the open neighbor with the lowest g until
+        the start; positive step costs make g strictly drop along the way."""
+        core = self._core
+        g = self._g
+        path = []
+        cell = core.goal
+        while cell != core.start:
+            cell = min(
+                (n for n in core.neighbors(cell) if not core.walls[n]),
+                key=lambda n: g.get(n, INFINITY),
+            )
+            path.append(cell)
+        return path
+
+    def is_finished(self) -> bool:
+        return self._finished
+
+    def found_goal(self) -> bool:
+        return self._found_goal
+
+    def visited(self) -> CellView:
+        return CellView(self._core, self._core.visited)
+
+    def position(self) -> Position:
+        return self._core.position(self._current)
+
+    def to_explore(self) -> CellView:
+        return CellView(self._core, deque(self._keys))
+
+    def neighbors(self) -> list[Position]:
+        return [translate(self.position(), direction) for direction in directions]
+
+    def seen(self) -> CellView:
+        return CellView(self._core, self._core.seen)
+
+    def optimal_path(self) -> list[Position]:
+        return self._optimal_path
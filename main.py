@@ -7,11 +7,20 @@
 # through step-by-step process.
 
 
+import argparse
+import asyncio
+from functools import partial
+import astar_agent
+import json
+import sys
 import time
 import bfs_agent
 import dfs_agent
 from domain import IAgent, COLOR_VISITED
+from components import ComponentIndex
+from heuristics import HEURISTICS
 from grid import (
+    FrameRenderer,
     Grid,
     ObjectColor,
     hard_coded_grid,
@@ -21,39 +30,186 @@ from grid import (
     elevation_mapping,
     PositionChar,
 )
-import os
 
+import solver
+from map_format import open_grid
+from planner_service import Planner, serve
 import ufs_agent
 
 
-def print_stats(agent: IAgent) -> None:
-    print(
-        f"visited ({PositionChar.VISITED.value}): ",
-        len((agent.visited())),
+def stats_lines(agent: IAgent) -> list[str]:
+    metrics = agent.metrics()
+    queued = len(agent.to_explore()) if metrics is None else metrics.frontier
+    lines = [
+        f"visited ({PositionChar.VISITED.value}):  {len(agent.visited())}",
+        f"queue ({PositionChar.QUEUE.value}):  {queued}",
+        f"Agent: {ObjectColor.AGENT.value}{PositionChar.AGENT.value}{COLOR_NORM}",
+        f"Start: {ObjectColor.START.value}{PositionChar.START.value}{COLOR_NORM}",
+        f"Goal: {ObjectColor.GOAL.value}{PositionChar.GOAL.value}{COLOR_NORM}",
+        f"Wall: {ObjectColor.WALL.value}{PositionChar.WALL.value}{COLOR_NORM}",
+        f"optimal path ({PositionChar.PATH.value}) length:  "
+        f"{len(agent.optimal_path())}",
+    ]
+    legend = "".join(
+        f"{elevation_mapping[elevation].value}{elevation}\033[0m "
+        for elevation in range(6)
     )
-    print(
-        f"queue ({PositionChar.QUEUE.value}): ",
-        len(set(agent.to_explore())),
-    )
-    print(f"Agent: {ObjectColor.AGENT.value}{PositionChar.AGENT.value}{COLOR_NORM}")
-    print(f"Start: {ObjectColor.START.value}{PositionChar.START.value}{COLOR_NORM}")
-    print(f"Goal: {ObjectColor.GOAL.value}{PositionChar.GOAL.value}{COLOR_NORM}")
-    print(f"Wall: {ObjectColor.WALL.value}{PositionChar.WALL.value}{COLOR_NORM}")
-    print(
-        f"optimal path ({PositionChar.PATH.value}) length: ",
-        len((agent.optimal_path())),
-    )
-    print("Elevation legend: ", end=" ")
-    for elevation in range(6):
-        color_code = elevation_mapping[elevation].value
-        print(f"{color_code}{elevation}\033[0m", end=" ")
-    print()
+    lines.append(f"Elevation legend:  {legend}")
+    if metrics is not None:
+        mean_step = metrics.step_seconds / metrics.steps if metrics.steps else 0.0
+        lines.append(
+            f"expansions: {metrics.expansions}  queue peak: {metrics.frontier_peak}  "
+            f"step: {mean_step * 1e6:.0f}us avg, "
+            f"{metrics.max_step_seconds * 1e6:.0f}us max"
+        )
+        lines.append(
+            f"rejected: {metrics.rejected_wall} wall, "
+            f"{metrics.rejected_bounds} out of bounds, "
+            f"{metrics.rejected_visited} visited, {metrics.rejected_queued} queued"
+        )
     if type(agent) == ufs_agent.UfsAgent:
-        print(f"agent._cost: {agent._cost}")
+        lines.append(f"agent._cost: {agent._cost}")
+    return lines
 
 
-if __name__ == "__main__":
+def _draw(renderer: FrameRenderer, lines: list[str]) -> int:
+    """Redraw the text lines and the changed grid cells in place; returns
+    the terminal row just below the grid."""
+    sys.stdout.write("\033[H" + "".join(f"{line}\033[K\n" for line in lines))
+    top = len(lines) + 1
+    renderer.draw(top)
+    return top + renderer.height() + 2
+
+
+def _draw_window(
+    renderer: FrameRenderer, lines: list[str], view: tuple[int, int, int]
+) -> int:
+    """Like `_draw`, but writes a full window around the agent each time,
+    since the window moves with it."""
+    columns, rows, scale = view
+    frame = renderer.window(columns, rows, scale)
+    sys.stdout.write(
+        "\033[H"
+        + "".join(f"{line}\033[K\n" for line in lines)
+        + frame.replace("\n", "\033[K\n")
+    )
+    return len(lines) + frame.count("\n") + 1
+
+
+def animate(
+    grid: Grid,
+    agent: IAgent,
+    max_iterations: int = 1000,
+    view: tuple[int, int, int] | None = None,
+) -> None:
+    """Step `agent` on `grid` in the terminal. With `view` as (columns,
+    rows, scale), only that window of the grid is shown, following the
+    agent; see FrameRenderer.window()."""
+    components = ComponentIndex(grid)
+    connected = components.connected(grid.start(), grid.goal())
+    components.detach()
+    if not connected:
+        print("No path to goal!")
+        return
+    if agent.metrics() is None:
+        agent.instrument()
+    grid.add_agent(agent)
+    renderer = FrameRenderer(grid)
+    draw = _draw if view is None else partial(_draw_window, view=view)
+    sys.stdout.write("\033[?25l\033[2J")
+    bottom = 1
+    for _ in range(max_iterations):
+        if grid.is_finished() or agent.is_finished():
+            message = "Goal reached!" if agent.found_goal() else "No path to goal!"
+            bottom = draw(renderer, [message] + stats_lines(agent))
+            time.sleep(2)
+            break
+        grid.move_agents()
+        bottom = draw(renderer, stats_lines(agent))
+        # time.sleep(0.05)
+    else:
+        sys.stdout.write(f"\033[{bottom};1HMax iterations reached!\n")
+    sys.stdout.write(f"\033[{bottom};1H\033[?25h")
+    sys.stdout.flush()
+
+
+def print_result(result: solver.SolveResult, output_format: str) -> None:
+    if output_format == "json":
+        print(json.dumps(result.to_dict()))
+        return
+    print(f"agent: {result.agent_type}")
+    print(f"found: {result.found}")
+    print(f"path length: {len(result.path)}")
+    print(f"cost: {result.cost}")
+    print(f"expansions: {result.expansions}")
+    print(f"time: {result.seconds:.6f}s")
+    print("path:", " ".join(f"({p.x_coord},{p.y_coord})" for p in result.path))
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Grid search simulator. Without --agent, runs interactively."
+    )
+    parser.add_argument(
+        "--grid",
+        help="grid text, binary map or .map benchmark file (default: built-in grid)",
+    )
+    parser.add_argument(
+        "--agent",
+        choices=sorted(solver.AGENT_TYPES),
+        help="agent type; solves headless unless --animate is given",
+    )
+    parser.add_argument(
+        "--heuristic",
+        choices=sorted(HEURISTICS),
+        default="manhattan",
+        help="A*/JPS heuristic",
+    )
+    parser.add_argument(
+        "--move-cost",
+        type=int,
+        help="A*/JPS cost per move on top of the elevation of the entered cell "
+        "(default: 0 for A*, 1 for JPS)",
+    )
+    parser.add_argument(
+        "--queue",
+        choices=ufs_agent.QUEUES,
+        default="heap",
+        help="UFS priority queue backend",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="bit-pack the search state, for grids too large for a byte per cell",
+    )
+    parser.add_argument("--format", choices=["text", "json"], default="text")
+    parser.add_argument(
+        "--animate", action="store_true", help="render every step in the terminal"
+    )
+    parser.add_argument("--max-iterations", type=int, default=1000)
+    parser.add_argument(
+        "--view",
+        type=int,
+        nargs=2,
+        metavar=("COLUMNS", "ROWS"),
+        help="with --animate, show only a window of this many cells around "
+        "the agent",
+    )
+    parser.add_argument(
+        "--serve",
+        metavar="ADDRESS",
+        help="answer JSON-line plan requests on HOST:PORT or a Unix socket path",
+    )
+    parser.add_argument(
+        "--zoom",
+        type=int,
+        default=1,
+        help="with --view, cells per window cell along each side",
+    )
+    return parser.parse_args(argv)
 
+
+def interactive() -> None:
     grid = hard_coded_grid()
     print(f"Welcome to Will Lapinel's {COLOR_VISITED}BFS Simulator!{COLOR_NORM}")
     custom = input('Customize settings? "Y" (any other key to use default settings)? ')
@@ -64,8 +220,9 @@ if __name__ == "__main__":
                        1. Breadth-First Search agent\n
                        2. Depth-First Search agent\n
                        3. Uniform Cost Search agent\n
+                       4. A* Search agent\n
                        """
-    agent_type = int_input_with_limits(1, 3, agent_type_prompt)
+    agent_type = int_input_with_limits(1, 4, agent_type_prompt)
     agent = None
     if agent_type == 1:
         agent = bfs_agent.new_bfs_agent()
@@ -73,28 +230,62 @@ if __name__ == "__main__":
         agent = dfs_agent.new_dfs_agent()
     elif agent_type == 3:
         agent = ufs_agent.new_ufs_agent()
+    elif agent_type == 4:
+        agent = astar_agent.new_astar_agent()
     else:
         raise ValueError
-    grid.add_agent(agent)
-    max_iterations = 1000
-    print("\033[?25l", end="")
-    for i in range(max_iterations):
-        print("\033[H", end="")
-        if i != max_iterations - 1:
-            if os.name == "nt":
-                os.system("cls")
-            # For Mac and Linux
-            else:
-                os.system("clear")
-        if grid.is_finished():
-            print("Goal reached!")
-            print_stats(agent)
-            grid.render()
-            time.sleep(2)
-            print("\033[?25h", end="")
-            exit()
-        grid.move_agents()
-        print_stats(agent)
-        grid.render()
-        # time.sleep(0.05)
-    print("Max iterations reached!")
+    animate(grid, agent)
+
+
+async def serve_grid(grid: Grid, address: str) -> None:
+    """Serve plan requests until interrupted; `address` is HOST:PORT or a
+    Unix socket path."""
+    planner = Planner(grid)
+    if ":" in address:
+        host, port = address.rsplit(":", 1)
+        server = await serve(planner, host, int(port))
+    else:
+        server = await serve(planner, path=address)
+    print(f"serving on {address}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        planner.close()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.serve:
+        grid = open_grid(args.grid) if args.grid else hard_coded_grid()
+        asyncio.run(serve_grid(grid, args.serve))
+    elif args.agent is None:
+        interactive()
+    else:
+        grid = open_grid(args.grid) if args.grid else hard_coded_grid()
+        agent_options = {}
+        if args.agent in ("astar", "jps"):
+            agent_options = {"heuristic": args.heuristic}
+            if args.move_cost is not None:
+                agent_options["move_cost"] = args.move_cost
+        elif args.agent == "ufs":
+            agent_options = {"queue": args.queue}
+        if args.animate:
+            agent = solver.new_agent(args.agent, **agent_options)
+            if args.compact:
+                agent.compact()
+            view = None
+            if args.view is not None:
+                view = (args.view[0], args.view[1], max(1, args.zoom))
+            animate(grid, agent, args.max_iterations, view)
+        else:
+            components = ComponentIndex(grid)
+            result = solver.solve(
+                grid,
+                args.agent,
+                components=components,
+                compact=args.compact,
+                **agent_options,
+            )
+            components.detach()
+            print_result(result, args.format)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+import mmap
+import struct
+
+from domain import Dimensions, Position
+from grid import Grid, load_grid
+
+_MAGIC = b"GMAP"
+_HEADER = struct.Struct("<4sHIIIIII")
+"""magic, format version, width, height, start x, start y, goal x, goal y"""
+_FORMAT_VERSION = 1
+
+_MOVINGAI_WALLS = bytes.maketrans(b".GSWTO@", b"\x00\x00\x00\x01\x01\x01\x01")
+"""Benchmark .map terrain to wall flags: ground and swamp are open; water,
+trees and out-of-bounds are walls"""
+
+
+def save_map(grid: Grid, path: str):
+    """Write `grid` as a binary map: the header, then the wall plane and the
+    elevation plane exactly as Grid keeps them, so `load_map` can use the
+    file's bytes in place."""
+    start, goal = grid.start(), grid.goal()
+    header = _HEADER.pack(
+        _MAGIC,
+        _FORMAT_VERSION,
+        grid.width(),
+        grid.height(),
+        start.x_coord,
+        start.y_coord,
+        goal.x_coord,
+        goal.y_coord,
+    )
+    with open(path, "wb") as map_file:
+        map_file.write(header)
+        map_file.write(grid.wall_plane())
+        map_file.write(grid.el_plane())
+
+
+def load_map(path: str) -> Grid:
+    """Open a binary map written by `save_map` without reading it in.
+
+    The file is mapped copy-on-write and the grid's planes are views into
+    the mapping, so pages are read on first touch and edits to the grid
+    never reach the file.
+    """
+    with open(path, "rb") as map_file:
+        mapping = mmap.mmap(map_file.fileno(), 0, access=mmap.ACCESS_COPY)
+    if len(mapping) < _HEADER.size:
+        raise ValueError("Map file is truncated.")
+    magic, version, width, height, start_x, start_y, goal_x, goal_y = (
+        _HEADER.unpack_from(mapping)
+    )
+    if magic != _MAGIC or version != _FORMAT_VERSION:
+        raise ValueError("Not a map file, or an unsupported version.")
+    size = width * height
+    if len(mapping) != _HEADER.size + 2 * size:
+        raise ValueError("Map file size does not match its dimensions.")
+    view = memoryview(mapping)
+    return Grid(
+        Dimensions(width, height),
+        Position(start_x, start_y),
+        Position(goal_x, goal_y),
+        [],
+        wall_plane=view[_HEADER.size : _HEADER.size + size],
+        el_plane=view[_HEADER.size + size :],
+    )
+
+
+def import_movingai_map(
+    path: str, start: Position | None = None, goal: Position | None = None
+) -> Grid:
+    """Read a grid from the text .map benchmark format.
+
+    The format carries no start or goal (those live in its .scen files), so
+    they default to the first and last open cells in row order. Elevation
+    is 0 everywhere.
+    """
+    with open(path, "rb") as map_file:
+        data = map_file.read()
+    header, separator, body = data.partition(b"\nmap")
+    if not separator:
+        raise ValueError("Missing 'map' line in .map file.")
+    fields = dict(line.split(None, 1) for line in header.split(b"\n") if line.strip())
+    width, height = int(fields[b"width"]), int(fields[b"height"])
+    rows = body.split()
+    if len(rows) != height or any(len(row) != width for row in rows):
+        raise ValueError("Map rows do not match the declared dimensions.")
+    walls = bytearray(b"".join(rows).translate(_MOVINGAI_WALLS))
+    if walls.translate(None, b"\x00\x01"):
+        raise ValueError("Unknown terrain character in .map file.")
+    if start is None or goal is None:
+        first, last = walls.find(0), walls.rfind(0)
+        if first == last:
+            raise ValueError("A map needs two open cells for a start and goal.")
+        if start is None:
+            start = Position(first % width, first // width)
+        if goal is None:
+            goal = Position(last % width, last // width)
+    return Grid(
+        Dimensions(width, height),
+        start,
+        goal,
+        [],
+        wall_plane=walls,
+        el_plane=bytearray(width * height),
+    )
+
+
+def open_grid(path: str) -> Grid:
+    """Load a grid by file type: a binary map, a .map benchmark map, or
+    grid text (see `grid.grid_from_text`)."""
+    with open(path, "rb") as grid_file:
+        magic = grid_file.read(len(_MAGIC))
+    if magic == _MAGIC:
+        return load_map(path)
+    if path.endswith(".map"):
+        return import_movingai_map(path)
+    return load_grid(path)
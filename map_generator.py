@@ -0,0 +1,180 @@
+from __future__ import annotations
+import random
+
+from domain import Dimensions, Position
+
+MAP_KINDS = ("open", "density", "maze", "rooms")
+MAX_ELEVATION = 5
+
+_CLAMP = [bytes(min(value, ceiling) for value in range(256)) for ceiling in range(256)]
+"""Translate tables capping every byte at the table's index"""
+
+
+def generate_planes(
+    width: int,
+    height: int,
+    seed: int | None = None,
+    kind: str = "rooms",
+    wall_density: float = 0.3,
+    room_size: int = 12,
+    terrain: bool = True,
+) -> tuple[Dimensions, Position, Position, bytearray, bytearray]:
+    """Dimensions, start, goal, wall plane and elevation plane of a random map.
+
+    The same seed and options always give the same map. `kind` picks the
+    walls: "open" has none, "density" walls each cell with probability
+    `wall_density`, "maze" is a binary-tree maze with one-cell corridors,
+    and "rooms" puts one room in each `room_size` square and joins it to
+    its right and lower neighbors. With `terrain`, elevation comes from
+    square mountains shaped like `grid.create_mountain`'s, widened to suit
+    the map size. The start and goal are the first and last open cells in
+    row order.
+
+    Planes are filled a row, a strided column or a whole plane at a time
+    (slice assignment and `bytes.translate`), never a cell at a time.
+    """
+    if kind not in MAP_KINDS:
+        raise ValueError(f"Unknown map kind {kind!r}; expected one of {MAP_KINDS}")
+    if width < 1 or height < 1:
+        raise ValueError("Map dimensions must be positive.")
+    rng = random.Random(seed)
+    walls = bytearray(width * height)
+    if kind == "density":
+        _scatter_walls(walls, rng, wall_density)
+    elif kind == "maze":
+        _carve_maze(walls, width, height, rng)
+    elif kind == "rooms":
+        _carve_rooms(walls, width, height, rng, room_size)
+    els = bytearray(width * height)
+    if terrain:
+        _raise_terrain(els, width, height, rng)
+    first, last = walls.find(0), walls.rfind(0)
+    if first == last:
+        raise ValueError("Generated map has fewer than two open cells.")
+    start = Position(first % width, first // width)
+    goal = Position(last % width, last // width)
+    return Dimensions(width, height), start, goal, walls, els
+
+
+def _scatter_walls(walls: bytearray, rng: random.Random, density: float):
+    threshold = round(density * 256)
+    table = bytes(int(value < threshold) for value in range(256))
+    walls[:] = rng.randbytes(len(walls)).translate(table)
+
+
+def _carve_maze(walls: bytearray, width: int, height: int, rng: random.Random):
+    """Binary-tree maze: maze cells sit on odd coordinates, and each one is
+    joined to the cell above or to its right, chosen at random. The top row
+    and right column are therefore straight corridors."""
+    walls[:] = b"\x01" * len(walls)
+    columns, rows = (width - 1) // 2, (height - 1) // 2
+    if columns < 1 or rows < 1:
+        walls[:] = bytes(len(walls))
+        return
+    coin = bytes(value & 1 for value in range(256))
+    for row in range(rows):
+        y = 2 * row + 1
+        line = y * width
+        above = line - width
+        # 1 where the cell is joined to its right neighbor
+        east = bytearray(rng.randbytes(columns).translate(coin))
+        east[-1] = 0
+        if row == 0:
+            east[:-1] = b"\x01" * (columns - 1)
+        walls[line + 1 : line + 2 * columns : 2] = bytes(columns)
+        walls[line + 2 : line + 2 * columns : 2] = east[:-1].translate(_FLIP)
+        if row > 0:
+            # cells not joined to the right are joined upward
+            walls[above + 1 : above + 2 * columns : 2] = east
+
+
+_FLIP = bytes([1, 0]) + bytes(254)
+"""Translate table swapping 0 and 1"""
+
+
+def _carve_rooms(
+    walls: bytearray, width: int, height: int, rng: random.Random, room_size: int
+):
+    """One room per `room_size` square, built a band of squares at a time:
+    each grid row in a band is joined from per-square segments. Room sizes
+    and offsets come from one `randbytes` call per band. Every room is then
+    joined to the rooms right of and above it by an L-shaped corridor: along
+    the row of one room's center, then along the column of the other's."""
+    room_size = min(max(room_size, 4), 255)
+    lefts = [left for left in range(0, width, room_size) if width - left >= 3]
+    tail = b"\x01" * (width - (lefts[-1] + room_size if lefts else 0))
+    # room centers of the previous band
+    above: list[tuple[int, int]] = []
+    for top in range(0, height, room_size):
+        span_y = min(room_size, height - top)
+        if span_y < 3 or not lefts:
+            walls[top * width : (top + span_y) * width] = b"\x01" * (span_y * width)
+            continue
+        noise = rng.randbytes(4 * len(lefts))
+        rooms = []
+        centers = []
+        for i, left in enumerate(lefts):
+            span_x = min(room_size, width - left)
+            room_w = 1 + noise[4 * i] % (span_x - 2)
+            room_h = 1 + noise[4 * i + 1] % (span_y - 2)
+            offset_x = 1 + noise[4 * i + 2] % (span_x - 1 - room_w)
+            offset_y = 1 + noise[4 * i + 3] % (span_y - 1 - room_h)
+            solid = b"\x01" * span_x
+            room = (
+                b"\x01" * offset_x
+                + bytes(room_w)
+                + b"\x01" * (span_x - offset_x - room_w)
+            )
+            rooms.append((offset_y, offset_y + room_h, room, solid))
+            centers.append(
+                (left + offset_x + room_w // 2, top + offset_y + room_h // 2)
+            )
+        for row in range(span_y):
+            line = (top + row) * width
+            walls[line : line + width] = (
+                b"".join(
+                    [
+                        room if first <= row < last else solid
+                        for first, last, room, solid in rooms
+                    ]
+                )
+                + tail
+            )
+        for i, (x, y) in enumerate(centers):
+            if i:
+                # across from the left neighbor's center, then to this one
+                left_x, left_y = centers[i - 1]
+                line = left_y * width
+                walls[line + left_x : line + x + 1] = bytes(x - left_x + 1)
+                low, high = min(left_y, y), max(left_y, y)
+                walls[low * width + x : high * width + x + 1 : width] = bytes(
+                    high - low + 1
+                )
+            if above:
+                # across from the upper neighbor's center, then down to this one
+                up_x, up_y = above[i]
+                low, high = min(up_x, x), max(up_x, x)
+                line = up_y * width
+                walls[line + low : line + high + 1] = bytes(high - low + 1)
+                walls[up_y * width + x : y * width + x + 1 : width] = bytes(
+                    y - up_y + 1
+                )
+        above = centers
+
+
+def _raise_terrain(els: bytearray, width: int, height: int, rng: random.Random):
+    """Square mountains, later ones overwriting earlier ones. Each ring is
+    `spread` cells wide, so every mountain row is one of a few clamped
+    copies of the middle row's profile."""
+    spread = max(1, min(width, height) // 64)
+    reach = (MAX_ELEVATION + 1) * spread
+    for _ in range(width * height // (reach * reach) + 1):
+        peak = rng.randint(1, MAX_ELEVATION)
+        cx, cy = rng.randrange(width), rng.randrange(height)
+        radius = (peak + 1) * spread - 1
+        x0, x1 = max(0, cx - radius), min(width, cx + radius + 1)
+        profile = bytes(peak - abs(x - cx) // spread for x in range(x0, x1))
+        rows = [profile.translate(_CLAMP[peak - ring]) for ring in range(peak + 1)]
+        for y in range(max(0, cy - radius), min(height, cy + radius + 1)):
+            line = y * width
+            els[line + x0 : line + x1] = rows[abs(y - cy) // spread]
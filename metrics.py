@@ -0,0 +1,58 @@
+from __future__ import annotations
+import time
+from collections.abc import Callable
+
+from typing import Any
+
+
+class SearchMetrics:
+    """Counters for one agent's search, kept only while the agent is
+    instrumented (see `IAgent.instrument`).
+
+    The frontier counts entries, so for agents that leave stale entries in
+    their priority queue it can exceed the number of distinct cells waiting.
+    """
+
+    def __init__(self, on_expand: Callable[[Any], None] | None = None):
+        self.on_expand = on_expand
+        """Called with the Position of every expanded cell"""
+        self.expansions = 0
+        self.pushes = 0
+        self.pops = 0
+        self.frontier = 0
+        """Entries in the frontier now"""
+        self.frontier_peak = 0
+        self.rejected_wall = 0
+        self.rejected_bounds = 0
+        self.rejected_visited = 0
+        self.rejected_queued = 0
+        """Neighbors already in the frontier at no higher cost"""
+        self.steps = 0
+        self.step_seconds = 0.0
+        """Total time spent in timed `next()` calls"""
+        self.max_step_seconds = 0.0
+
+    def push(self):
+        self.pushes += 1
+        self.frontier += 1
+        if self.frontier > self.frontier_peak:
+            self.frontier_peak = self.frontier
+
+    def pop(self):
+        self.pops += 1
+        self.frontier -= 1
+
+    def time_step(self, step: Callable[[], None]):
+        """Run one `next()` call and add its duration to the step timings."""
+        began = time.perf_counter()
+        step()
+        elapsed = time.perf_counter() - began
+        self.steps += 1
+        self.step_seconds += elapsed
+        if elapsed > self.max_step_seconds:
+            self.max_step_seconds = elapsed
+
+    def to_dict(self) -> dict:
+        counters = dict(vars(self))
+        del counters["on_expand"]
+        return counters
@@ -0,0 +1,92 @@
+from __future__ import annotations
+import sys
+from collections import OrderedDict
+
+from domain import IGrid, Position
+from solver import SolveResult, solve
+
+_POSITION_BYTES = sys.getsizeof(Position(0, 0)) + sys.getsizeof(Position(0, 0).__dict__)
+_ENTRY_BYTES = 512
+"""Rough fixed cost of one entry: key tuple, result object and its dict"""
+
+
+class PathCache:
+    """LRU cache of solve() results for one grid.
+
+    Entries are keyed by (grid version, start, goal, agent type, agent
+    options), so a wall or elevation edit, which bumps `grid.version()`,
+    makes every older entry unreachable; the first lookup after an edit
+    drops them all. Cached results are shared between callers and must not
+    be mutated.
+    """
+
+    def __init__(
+        self, grid: IGrid, max_entries: int = 1024, max_bytes: int = 64 * 2**20
+    ):
+        self._grid = grid
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple, tuple[SolveResult, int]] = OrderedDict()
+        self._version = grid.version()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def solve(
+        self,
+        agent_type: str = "bfs",
+        start: Position | None = None,
+        goal: Position | None = None,
+        **agent_options,
+    ) -> SolveResult:
+        if self._grid.version() != self._version:
+            self.clear()
+            self._version = self._grid.version()
+            self.invalidations += 1
+        start = start or self._grid.start()
+        goal = goal or self._grid.goal()
+        key = (
+            self._version,
+            start.x_coord,
+            start.y_coord,
+            goal.x_coord,
+            goal.y_coord,
+            agent_type,
+            tuple(sorted(agent_options.items())),
+        )
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        result = solve(self._grid, agent_type, start=start, goal=goal, **agent_options)
+        size = _ENTRY_BYTES + len(result.path) * (_POSITION_BYTES + 8)
+        self._entries[key] = (result, size)
+        self._bytes += size
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+        return result
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,190 @@
+from __future__ import annotations
+import asyncio
+import json
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+
+from components import ComponentIndex
+from domain import IGrid, Position
+from solver import SolveResult, new_agent, solve
+
+
+class PlannerOverloaded(RuntimeError):
+    """Raised instead of queueing a plan request when the queue is full."""
+
+
+class Planner:
+    """Async front end to `solver.solve` for one grid.
+
+    `await planner.plan(start, goal)` runs the search on `executor` (by
+    default a thread pool of `workers` threads), so the event loop stays
+    free. Requests for the same start, goal, agent and options that arrive
+    while one is in flight share its result. At most `max_in_flight`
+    searches run at once; up to `max_queued` more wait their turn, and
+    further requests raise PlannerOverloaded. The grid must not be edited
+    while plans are running.
+    """
+
+    def __init__(
+        self,
+        grid: IGrid,
+        workers: int | None = None,
+        max_in_flight: int | None = None,
+        max_queued: int = 1024,
+        executor: Executor | None = None,
+    ):
+        self._grid = grid
+        self._components = ComponentIndex(grid)
+        """Answers plans with no path without a search"""
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(workers)
+        self._slots = asyncio.Semaphore(max_in_flight or workers or 4)
+        self.max_queued = max_queued
+        self._in_flight: dict[tuple, asyncio.Future[SolveResult]] = {}
+        self._queued = 0
+        self.requests = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    async def plan(
+        self,
+        start: Position | None = None,
+        goal: Position | None = None,
+        agent: str = "ufs",
+        max_expansions: int | None = None,
+        **agent_options,
+    ) -> SolveResult:
+        """Solve start to goal with a fresh agent; arguments are as for
+        `solver.solve`. Cancelling one caller does not cancel the search for
+        others waiting on it."""
+        start = start or self._grid.start()
+        goal = goal or self._grid.goal()
+        key = (
+            start.x_coord,
+            start.y_coord,
+            goal.x_coord,
+            goal.y_coord,
+            agent,
+            max_expansions,
+            tuple(sorted(agent_options.items())),
+        )
+        self.requests += 1
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+        if self._queued >= self.max_queued:
+            self.rejected += 1
+            raise PlannerOverloaded(f"{self._queued} plan requests already queued.")
+        # Fail fast on a bad agent name rather than inside the pool.
+        new_agent(agent, **agent_options)
+        self._queued += 1
+        task = asyncio.ensure_future(
+            self._run(start, goal, agent, max_expansions, agent_options)
+        )
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _run(
+        self,
+        start: Position,
+        goal: Position,
+        agent: str,
+        max_expansions: int | None,
+        agent_options: dict,
+    ) -> SolveResult:
+        try:
+            await self._slots.acquire()
+        finally:
+            self._queued -= 1
+        try:
+            job = partial(
+                solve,
+                self._grid,
+                agent,
+                max_expansions,
+                start,
+                goal,
+                components=self._components,
+                **agent_options,
+            )
+            return await asyncio.get_running_loop().run_in_executor(self._executor, job)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "in_flight": len(self._in_flight),
+            "queued": self._queued,
+        }
+
+    def close(self):
+        self._components.detach()
+        if self._own_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def serve(
+    planner: Planner, host: str = "127.0.0.1", port: int = 0, path: str | None = None
+) -> asyncio.AbstractServer:
+    """Start a line-based JSON server in front of `planner`, on a Unix
+    socket if `path` is given, else on TCP.
+
+    Each request line is an object like `{"id": 1, "start": [0, 0],
+    "goal": [5, 7], "agent": "astar", "max_expansions": 10000, "options":
+    {"heuristic": "octile"}}`, every key optional. Requests on one connection are planned
+    concurrently, so replies (`SolveResult.to_dict()` or `{"error": ...}`,
+    with the request's "id") can come back in any order.
+    """
+    handler = partial(_handle_connection, planner)
+    if path is not None:
+        return await asyncio.start_unix_server(handler, path)
+    return await asyncio.start_server(handler, host, port)
+
+
+async def _handle_connection(
+    planner: Planner, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+):
+    lock = asyncio.Lock()
+    tasks = set()
+    try:
+        while line := await reader.readline():
+            if line.strip():
+                task = asyncio.create_task(_reply(planner, line, writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def _reply(
+    planner: Planner, line: bytes, writer: asyncio.StreamWriter, lock: asyncio.Lock
+):
+    request_id = None
+    try:
+        request = json.loads(line)
+        request_id = request.get("id")
+        start, goal = request.get("start"), request.get("goal")
+        result = await planner.plan(
+            Position(*start) if start else None,
+            Position(*goal) if goal else None,
+            request.get("agent", "ufs"),
+            request.get("max_expansions"),
+            **request.get("options", {}),
+        )
+        reply = result.to_dict()
+    except Exception as error:
+        reply = {"error": str(error)}
+    reply["id"] = request_id
+    async with lock:
+        if writer.is_closing():
+            return
+        writer.write(json.dumps(reply).encode() + b"\n")
+        await writer.drain()
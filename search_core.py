@@ -0,0 +1,369 @@
+from __future__ import annotations
+from array import array
+from collections import deque
+from collections.abc import Collection, Iterable, Iterator, Set
+
+from domain import IGrid, Position, directions
+from metrics import SearchMetrics
+
+
+class CellFlags:
+    """Membership flags for flat cell ids, one byte per cell."""
+
+    def __init__(self, size: int) -> None:
+        self.flags = bytearray(size)
+        self.count = 0
+        """Flags set; code writing `flags` directly must keep it in step"""
+
+    def add(self, cell: int):
+        if not self.flags[cell]:
+            self.flags[cell] = 1
+            self.count += 1
+
+    def discard(self, cell: int):
+        if self.flags[cell]:
+            self.flags[cell] = 0
+            self.count -= 1
+
+    def add_range(self, first: int, end: int):
+        """Set every cell from `first` up to, not including, `end`."""
+        if first < end:
+            self.count += end - first - self.flags.count(1, first, end)
+            self.flags[first:end] = b"\x01" * (end - first)
+
+    def __contains__(self, cell: object) -> bool:
+        return self.flags[cell] == 1  # type: ignore[index]
+
+    def __iter__(self) -> Iterator[int]:
+        flags = self.flags
+        cell = flags.find(1)
+        while cell != -1:
+            yield cell
+            cell = flags.find(1, cell + 1)
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class BitFlags:
+    """CellFlags packed eight cells to a byte, for very large grids."""
+
+    def __init__(self, size: int) -> None:
+        self.bits = bytearray((size + 7) >> 3)
+        """Bit `cell & 7` of byte `cell >> 3` per cell"""
+        self.count = 0
+
+    def add(self, cell: int):
+        mask = 1 << (cell & 7)
+        if not self.bits[cell >> 3] & mask:
+            self.bits[cell >> 3] |= mask
+            self.count += 1
+
+    def discard(self, cell: int):
+        mask = 1 << (cell & 7)
+        if self.bits[cell >> 3] & mask:
+            self.bits[cell >> 3] &= ~mask
+            self.count -= 1
+
+    def add_range(self, first: int, end: int):
+        """Set every cell from `first` up to, not including, `end`."""
+        if first >= end:
+            return
+        bits = self.bits
+        low, high = first >> 3, (end - 1) >> 3
+        low_mask = 0xFF << (first & 7) & 0xFF
+        high_mask = 0xFF >> (7 - ((end - 1) & 7))
+        if low == high:
+            low_mask &= high_mask
+        else:
+            middle = bits[low + 1 : high]
+            self.count += ((high - low - 1) << 3) - int.from_bytes(
+                middle, "little"
+            ).bit_count()
+            bits[low + 1 : high] = b"\xff" * (high - low - 1)
+            self.count += (~bits[high] & high_mask).bit_count()
+            bits[high] |= high_mask
+        self.count += (~bits[low] & low_mask).bit_count()
+        bits[low] |= low_mask
+
+    def __contains__(self, cell: object) -> bool:
+        return bool(self.bits[cell >> 3] >> (cell & 7) & 1)  # type: ignore[operator]
+
+    def any_between(self, first: int, end: int) -> bool:
+        """Whether any cell from `first` up to, not including, `end` is set."""
+        if first >= end:
+            return False
+        bits = self.bits
+        low, high = first >> 3, (end - 1) >> 3
+        low_mask = 0xFF << (first & 7) & 0xFF
+        high_mask = 0xFF >> (7 - ((end - 1) & 7))
+        if low == high:
+            return bool(bits[low] & low_mask & high_mask)
+        return bool(
+            bits[low] & low_mask or bits[high] & high_mask or any(bits[low + 1 : high])
+        )
+
+    def __iter__(self) -> Iterator[int]:
+        for index, byte in enumerate(self.bits):
+            if byte:
+                for bit in range(8):
+                    if byte >> bit & 1:
+                        yield index << 3 | bit
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class DirectionParents:
+    """Parent table for searches whose parents are always neighbors: each
+    cell stores which of `directions` leads to its parent, in two bits.
+
+    Indexed like the plain parent array, by cell id, and returns and takes
+    parent cell ids. Unlike the array there is no "unset" value, so only
+    cells that were given a parent may be read.
+    """
+
+    def __init__(self, size: int, width: int) -> None:
+        self.codes = bytearray((size + 3) >> 2)
+        """Bits `2 * (cell & 3)` and up of byte `cell >> 2` per cell"""
+        self._offsets = [dy * width + dx for dx, dy in directions]
+        self._code_of = {offset: code for code, offset in enumerate(self._offsets)}
+
+    def __getitem__(self, cell: int) -> int:
+        code = self.codes[cell >> 2] >> ((cell & 3) << 1) & 3
+        return cell + self._offsets[code]
+
+    def __setitem__(self, cell: int, parent: int):
+        shift = (cell & 3) << 1
+        byte = self.codes[cell >> 2] & ~(3 << shift)
+        self.codes[cell >> 2] = byte | self._code_of[parent - cell] << shift
+
+    def __len__(self) -> int:
+        return len(self.codes) << 2
+
+
+class SparseParents(dict):
+    """Parent table as a dict, for compact searches whose parents need not
+    be neighbors but are only set for the few cells the search jumps to.
+    Unset cells read as -1, like the plain parent array."""
+
+    def __missing__(self, cell: int) -> int:
+        return -1
+
+
+class Frontier:
+    """Deque of cell ids with membership flags kept alongside it.
+
+    Used as a FIFO queue (append/popleft) or a LIFO stack (append/pop);
+    `cell in frontier` is O(1) however wide the frontier grows. Takes its
+    flags from `SearchCore.new_flags()`, so they are packed with the rest
+    of a compact core.
+    """
+
+    def __init__(self, members: CellFlags | BitFlags) -> None:
+        self.order: deque[int] = deque()
+        """Cells in insertion order; `members` must be kept in step with it"""
+        self.members = members
+
+    def append(self, cell: int):
+        self.order.append(cell)
+        self.members.add(cell)
+
+    def popleft(self) -> int:
+        cell = self.order.popleft()
+        self.members.discard(cell)
+        return cell
+
+    def pop(self) -> int:
+        cell = self.order.pop()
+        self.members.discard(cell)
+        return cell
+
+    def __contains__(self, cell: object) -> bool:
+        return cell in self.members
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.order)
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+
+class BucketQueue:
+    """Dial's bucket queue of `(cost, counter, cell)` entries.
+
+    A drop-in for a heapq list in a uniform-cost search whose step costs
+    are elevations: integers from 0 to 255. Pushes must cost no less than
+    the last pop and at most 255 more, so the live costs always fit a ring
+    of 256 FIFO buckets and push and pop are O(1). Entries of equal cost
+    pop in push order, which is the heap's `(cost, counter)` order when the
+    counter only grows.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: list[deque[tuple[int, int, int]]] = [deque() for _ in range(256)]
+        self._cost = 0
+        """Cost of the last pop; every queued entry costs at least this"""
+        self._len = 0
+
+    def push(self, entry: tuple[int, int, int]):
+        self._buckets[entry[0] & 255].append(entry)
+        self._len += 1
+
+    def pop(self) -> tuple[int, int, int]:
+        if not self._len:
+            raise IndexError("pop from an empty BucketQueue")
+        buckets = self._buckets
+        cost = self._cost
+        while not buckets[cost & 255]:
+            cost += 1
+        self._cost = cost
+        self._len -= 1
+        return buckets[cost & 255].popleft()
+
+    def __iter__(self) -> Iterator[tuple[int, int, int]]:
+        for bucket in self._buckets:
+            yield from bucket
+
+    def __len__(self) -> int:
+        return self._len
+
+
+class CellView(Set):
+    """Read-only view presenting a container of cell ids as Positions.
+
+    Nothing is copied: membership tests convert the Position to a cell id and
+    iteration creates Positions lazily.
+    """
+
+    def __init__(self, core: CellLayout, cells: Collection[int]) -> None:
+        self._core = core
+        self._cells = cells
+
+    def cells(self) -> Collection[int]:
+        """The underlying cell ids, for callers that work on cell ids too."""
+        return self._cells
+
+    @classmethod
+    def _from_iterable(cls, it: Iterable[Position]) -> set[Position]:
+        return set(it)
+
+    def __contains__(self, pos: object) -> bool:
+        if not isinstance(pos, Position):
+            return False
+        cell = self._core.index(pos)
+        return cell is not None and cell in self._cells
+
+    def __iter__(self) -> Iterator[Position]:
+        position = self._core.position
+        return (position(cell) for cell in self._cells)
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+
+class CellLayout:
+    """Flat integer cell ids (y * width + x) for one grid: conversion to and
+    from Positions and the neighbors of a cell. Owns no per-cell state."""
+
+    def __init__(self, grid: IGrid) -> None:
+        self.width = grid.width()
+        self.height = grid.height()
+        self.size = self.width * self.height
+        self.steps: list[tuple[int, int]] = [
+            (dx, dy * self.width + dx) for dx, dy in directions
+        ]
+        """(x delta, cell id offset) per direction, in `directions` order"""
+        self.start = self.index(grid.start())
+        self.goal = self.index(grid.goal())
+
+    def index(self, pos: Position) -> int | None:
+        if 0 <= pos.x_coord < self.width and 0 <= pos.y_coord < self.height:
+            return pos.y_coord * self.width + pos.x_coord
+        return None
+
+    def position(self, cell: int) -> Position:
+        return Position(cell % self.width, cell // self.width)
+
+    def neighbors(self, cell: int) -> list[int]:
+        """In-bounds neighbor cells in `directions` order, walls included."""
+        x = cell % self.width
+        cells = []
+        for dx, offset in self.steps:
+            if dx:
+                if 0 <= x + dx < self.width:
+                    cells.append(cell + offset)
+            else:
+                neighbor = cell + offset
+                if 0 <= neighbor < self.size:
+                    cells.append(neighbor)
+        return cells
+
+
+class SearchCore(CellLayout):
+    """Per-search bookkeeping on flat integer cell ids (y * width + x).
+
+    Agents expand cells as plain ints against the grid's wall and elevation
+    planes; Position objects are only created at the IAgent boundary.
+    """
+
+    def __init__(
+        self,
+        grid: IGrid,
+        compact: bool = False,
+        neighbor_parents: bool = True,
+    ) -> None:
+        """`compact` packs the flags into BitFlags and the parents into
+        DirectionParents if every parent is a neighbor of its cell, or else
+        into SparseParents."""
+        super().__init__(grid)
+        self.compact = compact
+        """Whether the state is bit-packed; the agents' unrolled `run()`
+        loops only handle the plain bytearrays and fall back to `next()`"""
+        self._neighbor_parents = neighbor_parents
+        self.walls = grid.wall_plane()
+        self.els = grid.el_plane()
+        self.visited = self.new_flags()
+        self.seen = self.new_flags()
+        self.parents = self.new_parents()
+        """Parent cell id per cell, -1 where unset unless packed"""
+
+    def new_flags(self) -> CellFlags | BitFlags:
+        """Empty flags for this grid, packed if the core is compact."""
+        return BitFlags(self.size) if self.compact else CellFlags(self.size)
+
+    def new_parents(self) -> array | DirectionParents | SparseParents:
+        """An empty parent table for this grid, packed if the core is compact."""
+        if not self.compact:
+            return array("i", [-1]) * self.size
+        if self._neighbor_parents:
+            return DirectionParents(self.size, self.width)
+        return SparseParents()
+
+    def is_open(self, cell: int) -> bool:
+        return not self.walls[cell]
+
+    def expanded(self, metrics: SearchMetrics, cell: int, neighbors: list[int]):
+        """Count the expansion of `cell`, whose in-bounds neighbors are
+        `neighbors`; the missing directions count as out of bounds."""
+        metrics.expansions += 1
+        metrics.rejected_bounds += len(self.steps) - len(neighbors)
+        if metrics.on_expand is not None:
+            metrics.on_expand(self.position(cell))
+
+    def rejected(self, metrics: SearchMetrics, cell: int):
+        """Count why neighbor `cell` was not added to the frontier."""
+        if self.walls[cell]:
+            metrics.rejected_wall += 1
+        elif cell in self.visited:
+            metrics.rejected_visited += 1
+        else:
+            metrics.rejected_queued += 1
+
+    def path_to(self, cell: int) -> list[Position]:
+        """Parent chain from `cell` back to the start, excluding `cell` itself."""
+        path = []
+        while cell != self.start:
+            cell = self.parents[cell]
+            path.append(self.position(cell))
+        return path
@@ -0,0 +1,184 @@
+from __future__ import annotations
+import time
+from collections.abc import Callable, Sequence
+
+import astar_agent
+import bfs_agent
+import bidirectional_agent
+import dfs_agent
+import jps_agent
+import ufs_agent
+import wavefront_agent
+from components import ComponentIndex
+from domain import IAgent, IGrid, Position
+from metrics import SearchMetrics
+from grid import QueryGrid
+
+AGENT_TYPES: dict[str, Callable[..., IAgent]] = {
+    "bfs": bfs_agent.new_bfs_agent,
+    "dfs": dfs_agent.new_dfs_agent,
+    "ufs": ufs_agent.new_ufs_agent,
+    "astar": astar_agent.new_astar_agent,
+    "bibfs": bidirectional_agent.new_bidirectional_bfs_agent,
+    "biufs": bidirectional_agent.new_bidirectional_ufs_agent,
+    "jps": jps_agent.new_jps_agent,
+    "wavefront": wavefront_agent.new_wavefront_agent,
+}
+
+
+def new_agent(agent_type: str, **agent_options) -> IAgent:
+    """Build an agent by name; `agent_options` go to its factory, for
+    example `new_agent("astar", heuristic="octile")`."""
+    try:
+        factory = AGENT_TYPES[agent_type]
+    except KeyError:
+        raise ValueError(
+            f"Unknown agent type {agent_type!r}, expected one of {sorted(AGENT_TYPES)}"
+        ) from None
+    return factory(**agent_options)
+
+
+class SolveResult:
+    def __init__(
+        self,
+        agent_type: str,
+        found: bool,
+        path: list[Position],
+        cost: int,
+        expansions: int,
+        seconds: float,
+        metrics: SearchMetrics | None = None,
+    ):
+        self.agent_type = agent_type
+        self.found = found
+        self.path = path
+        """Start to goal inclusive, empty when no path was found"""
+        self.cost = cost
+        """Cost of the path under the agent's model: `move_cost` plus the
+        elevation of every cell entered after the start"""
+        self.expansions = expansions
+        self.seconds = seconds
+        self.metrics = metrics
+        """Search counters when the agent was instrumented"""
+
+    def to_dict(self) -> dict:
+        result = {
+            "agent": self.agent_type,
+            "found": self.found,
+            "path": [[pos.x_coord, pos.y_coord] for pos in self.path],
+            "path_length": len(self.path),
+            "cost": self.cost,
+            "expansions": self.expansions,
+            "seconds": self.seconds,
+        }
+        if self.metrics is not None:
+            result["metrics"] = self.metrics.to_dict()
+        return result
+
+
+def path_cost(grid: IGrid, path: list[Position], move_cost: int = 0) -> int:
+    return sum(move_cost + grid.get_el(pos) for pos in path[1:])
+
+
+def solve(
+    grid: IGrid,
+    agent_type: str = "bfs",
+    max_expansions: int | None = None,
+    start: Position | None = None,
+    goal: Position | None = None,
+    instrument: bool = False,
+    components: ComponentIndex | None = None,
+    compact: bool = False,
+    **agent_options,
+) -> SolveResult:
+    """Run a fresh agent of `agent_type` on `grid` until it finishes.
+
+    `start` and `goal` default to the grid's own. Stops early after
+    `max_expansions` calls to `next()` if given, in which case the result
+    is reported as not found. With `instrument`, the result carries the
+    agent's SearchMetrics. Given the grid's ComponentIndex, a query with
+    no path is answered as not found without searching. `compact` packs
+    the agent's search state; see `IAgent.compact`.
+    """
+    start = start or grid.start()
+    goal = goal or grid.goal()
+    if start == goal:
+        return SolveResult(agent_type, True, [start], 0, 0, 0.0)
+    grid = QueryGrid(grid, start, goal)
+    if components is not None and not components.connected(start, goal):
+        return SolveResult(agent_type, False, [], 0, 0, 0.0)
+    agent = new_agent(agent_type, **agent_options)
+    if instrument:
+        agent.instrument()
+    if compact:
+        agent.compact()
+    agent.set_grid(grid)
+    began = time.perf_counter()
+    agent.run(max_expansions)
+    return _result(agent_type, agent, grid, time.perf_counter() - began)
+
+
+def race(
+    grid: IGrid,
+    agents: Sequence[str | tuple[str, dict]],
+    steps_per_tick: int = 1,
+    max_ticks: int | None = None,
+    components: ComponentIndex | None = None,
+) -> list[SolveResult]:
+    """Run several agents side by side on `grid`, for example
+    `race(grid, ["bfs", "dfs", ("astar", {"heuristic": "octile"})])`.
+
+    Each tick gives every unfinished agent up to `steps_per_tick` calls to
+    `next()`, so they advance together over the one shared grid and an
+    agent reaching the goal does not stop the others. Results come back in
+    the order of `agents`; `seconds` is the race time at which that agent
+    finished, or when the race was cut off after `max_ticks` ticks.
+    `components` is as for `solve`.
+    """
+    if components is not None and not components.connected(grid.start(), grid.goal()):
+        return [
+            SolveResult(
+                entry if isinstance(entry, str) else entry[0], False, [], 0, 0, 0.0
+            )
+            for entry in agents
+        ]
+    query = QueryGrid(grid, grid.start(), grid.goal())
+    entries = []
+    for entry in agents:
+        agent_type, agent_options = (entry, {}) if isinstance(entry, str) else entry
+        agent = new_agent(agent_type, **agent_options)
+        query.add_agent(agent)
+        entries.append((agent_type, agent))
+    finished_at: dict[int, float] = {}
+    began = time.perf_counter()
+    ticks = 0
+    while not query.is_finished():
+        if max_ticks is not None and ticks >= max_ticks:
+            break
+        query.move_agents(steps_per_tick)
+        ticks += 1
+        now = time.perf_counter() - began
+        for index, (_, agent) in enumerate(entries):
+            if agent.is_finished():
+                finished_at.setdefault(index, now)
+    seconds = time.perf_counter() - began
+    return [
+        _result(agent_type, agent, query, finished_at.get(index, seconds))
+        for index, (agent_type, agent) in enumerate(entries)
+    ]
+
+
+def _result(agent_type: str, agent: IAgent, grid: IGrid, seconds: float):
+    path: list[Position] = []
+    if agent.found_goal():
+        path = list(reversed(agent.optimal_path()))
+        path.append(grid.goal())
+    return SolveResult(
+        agent_type,
+        agent.found_goal(),
+        path,
+        path_cost(grid, path, agent.move_cost()),
+        len(agent.visited()),
+        seconds,
+        agent.metrics(),
+    )
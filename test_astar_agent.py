@@ -0,0 +1,50 @@
+import random
+
+import solver
+from domain import Dimensions, Position
+from grid import Grid
+from grid_testing import check_path, random_grids
+
+
+def lowest_open_el(g) -> int:
+    return min(
+        (el for el, wall in zip(g.el_plane(), g.wall_plane()) if not wall), default=0
+    )
+
+
+def test_lowest_el_follows_edits():
+    for seed, g in enumerate(random_grids(40)):
+        r = random.Random(seed)
+        for _ in range(20):
+            assert g.lowest_el() == lowest_open_el(g)
+            pos = Position(r.randrange(g.width()), r.randrange(g.height()))
+            if r.random() < 0.5 and pos not in (g.start(), g.goal()):
+                g.set_wall(pos, not g.is_wall(pos))
+            else:
+                g.set_el(pos, r.randint(0, 5))
+
+
+def test_heuristic_scale_ignores_walls():
+    # Walls sit at elevation 0 but every open cell costs at least 3, so the
+    # heuristic may count 3 per move and must still find the cheapest path.
+    walls = [Position(x, 10) for x in range(1, 20)]
+    g = Grid(Dimensions(20, 20), Position(10, 0), Position(10, 19), walls)
+    for pos in g.walls():
+        g.set_el(pos, 0)
+    for x in range(20):
+        for y in range(20):
+            if not g.is_wall(Position(x, y)):
+                g.set_el(Position(x, y), 3)
+    ref = solver.solve(g, "astar", heuristic="zero")
+    res = solver.solve(g, "astar")
+    check_path(g, res.path)
+    assert res.cost == ref.cost
+    assert res.expansions < ref.expansions
+
+
+def test_astar_matches_dijkstra():
+    for g in random_grids(40):
+        for move_cost in (0, 1):
+            ref = solver.solve(g, "astar", heuristic="zero", move_cost=move_cost)
+            res = solver.solve(g, "astar", move_cost=move_cost)
+            assert (res.found, res.cost) == (ref.found, ref.cost)
@@ -0,0 +1,53 @@
+import random
+
+import grid
+import solver
+from batch import solve_batch
+from domain import Position
+from map_format import save_map
+
+
+def random_queries(g, count: int, seed: int) -> list[tuple[Position, Position]]:
+    r = random.Random(seed)
+    cells = [
+        Position(x, y)
+        for x in range(g.width())
+        for y in range(g.height())
+        if not g.is_wall(Position(x, y))
+    ]
+    return [tuple(r.sample(cells, 2)) for _ in range(count)]
+
+
+def sequential(g, queries, agent_type: str, **agent_options):
+    return [
+        solver.solve(g, agent_type, start=start, goal=goal, **agent_options)
+        for start, goal in queries
+    ]
+
+
+def test_batch_matches_sequential():
+    g = grid.generate_random(40, 30, 3, "rooms")
+    queries = random_queries(g, 50, 3)
+    expected = sequential(g, queries, "astar", move_cost=1)
+    results = dict(
+        solve_batch(g, queries, "astar", workers=2, chunk_size=7, move_cost=1)
+    )
+    assert sorted(results) == list(range(len(queries)))
+    for index, result in results.items():
+        assert (result.found, result.path, result.cost) == (
+            expected[index].found,
+            expected[index].path,
+            expected[index].cost,
+        )
+
+
+def test_batch_from_map_file(tmp_path):
+    g = grid.generate_random(30, 30, 4, "maze")
+    path = str(tmp_path / "maze.gmap")
+    save_map(g, path)
+    queries = random_queries(g, 20, 4)
+    expected = sequential(g, queries, "bfs")
+    results = dict(solve_batch(path, queries, "bfs", workers=2))
+    assert [results[index].path for index in range(len(queries))] == [
+        result.path for result in expected
+    ]
@@ -0,0 +1,22 @@
+import solver
+from grid_testing import check_path, random_grids
+
+
+def test_bidirectional_bfs_matches_bfs():
+    for g in random_grids(60):
+        ref = solver.solve(g, "bfs")
+        res = solver.solve(g, "bibfs")
+        assert res.found == ref.found
+        if res.found:
+            check_path(g, res.path)
+            assert len(res.path) == len(ref.path)
+
+
+def test_bidirectional_ufs_matches_dijkstra():
+    for g in random_grids(60):
+        ref = solver.solve(g, "ufs")
+        res = solver.solve(g, "biufs")
+        assert res.found == ref.found
+        if res.found:
+            check_path(g, res.path)
+            assert res.cost == ref.cost
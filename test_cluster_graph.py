@@ -0,0 +1,50 @@
+import random
+
+import grid
+import solver
+from cluster_graph import ClusterGraph
+from domain import Position
+from grid_testing import check_path, random_grids
+
+
+def test_incremental_rebuild_matches_fresh_build():
+    for seed, g in enumerate(random_grids(40)):
+        r = random.Random(seed)
+        cluster_size = r.choice([2, 3, 5, 8])
+        move_cost = seed % 2
+        graph = ClusterGraph(g, cluster_size, move_cost)
+        for _ in range(20):
+            pos = Position(r.randrange(g.width()), r.randrange(g.height()))
+            if r.random() < 0.5 and pos not in (g.start(), g.goal()):
+                g.set_wall(pos, not g.is_wall(pos))
+            else:
+                g.set_el(pos, r.randint(0, 5))
+            if r.random() < 0.3:
+                res = graph.solve()
+                fresh_graph = ClusterGraph(g, cluster_size, move_cost)
+                fresh = fresh_graph.solve()
+                # Rebuilt transitions may be listed in another order, which
+                # can pick another path of the same cost.
+                assert (res.found, res.cost) == (fresh.found, fresh.cost)
+                for key in ("nodes", "edges"):
+                    assert graph.stats()[key] == fresh_graph.stats()[key]
+                ref = solver.solve(g, "astar", heuristic="zero", move_cost=move_cost)
+                assert res.found == ref.found
+                if res.found:
+                    check_path(g, res.path)
+                    assert res.cost >= ref.cost
+        graph.detach()
+
+
+def test_edit_rebuilds_only_nearby_clusters():
+    g = grid.generate_random(160, 160, 5, "rooms")
+    graph = ClusterGraph(g, 16, 1)
+    before = graph.rebuilt_clusters
+    pos = Position(80, 80)
+    g.set_el(pos, (g.get_el(pos) + 1) % 6)
+    res = graph.solve()
+    # The edited cluster and at most its four neighbors, of 100.
+    assert graph.rebuilt_clusters - before <= 5
+    fresh = ClusterGraph(g, 16, 1).solve()
+    assert (res.found, res.cost) == (fresh.found, fresh.cost)
+    graph.detach()
@@ -0,0 +1,79 @@
+import json
+import os
+import random
+import subprocess
+import sys
+from collections import deque
+
+from components import WALL, ComponentIndex
+from domain import Position
+from grid_testing import random_grids
+
+
+def flood_labels(g) -> list[int]:
+    """Component number per cell by plain flood fill, -1 for walls."""
+    width, size, walls = g.width(), g.width() * g.height(), g.wall_plane()
+    labels = [-1] * size
+    count = 0
+    for cell in range(size):
+        if walls[cell] or labels[cell] >= 0:
+            continue
+        labels[cell] = count
+        queue = deque([cell])
+        while queue:
+            here = queue.popleft()
+            x = here % width
+            for neighbor, inside in (
+                (here - 1, x > 0),
+                (here + 1, x < width - 1),
+                (here - width, here >= width),
+                (here + width, here + width < size),
+            ):
+                if inside and not walls[neighbor] and labels[neighbor] < 0:
+                    labels[neighbor] = count
+                    queue.append(neighbor)
+        count += 1
+    return labels
+
+
+def check_labels(g, index: ComponentIndex):
+    """Assert the index splits the open cells exactly as a flood fill does."""
+    width = g.width()
+    seen: dict[int, int] = {}
+    for cell, expected in enumerate(flood_labels(g)):
+        label = index.component(Position(cell % width, cell // width))
+        if expected < 0:
+            assert label == WALL
+        else:
+            assert label != WALL
+            assert seen.setdefault(expected, label) == label
+    assert len(set(seen.values())) == len(seen)
+
+
+def test_labels_follow_wall_edits():
+    for seed, g in enumerate(random_grids(60)):
+        r = random.Random(seed)
+        index = ComponentIndex(g)
+        check_labels(g, index)
+        for _ in range(40):
+            pos = Position(r.randrange(g.width()), r.randrange(g.height()))
+            if pos in (g.start(), g.goal()):
+                continue
+            g.set_wall(pos, not g.is_wall(pos))
+            check_labels(g, index)
+        index.detach()
+
+
+def test_cli_answers_walled_off_goal_without_searching(tmp_path):
+    path = tmp_path / "walled.txt"
+    path.write_text("S....#...\n.....#...\n.....#..G\n")
+    output = subprocess.run(
+        [sys.executable, "main.py", "--agent", "bfs", "--grid", str(path)]
+        + ["--format", "json"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    result = json.loads(output)
+    assert (result["found"], result["expansions"]) == (False, 0)
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+import solver
+from distance_field import DistanceField
+from domain import Position
+from grid_testing import random_grids
+
+
+def test_distances_match_dijkstra():
+    for seed, g in enumerate(random_grids(40)):
+        r = random.Random(seed)
+        move_cost = seed % 2
+        field = DistanceField.build(g, move_cost=move_cost)
+        for _ in range(5):
+            start = Position(r.randrange(g.width()), r.randrange(g.height()))
+            if g.is_wall(start):
+                assert field.distance(start) is None
+                continue
+            ref = solver.solve(
+                g, "astar", start=start, heuristic="zero", move_cost=move_cost
+            )
+            assert field.distance(start) == (ref.cost if ref.found else None)
+            path = field.path_from(start)
+            assert bool(path) == ref.found
+            if path:
+                assert path[0] == start and path[-1] == g.goal()
+                assert solver.path_cost(g, path, move_cost) == ref.cost
+
+
+def test_round_trip(tmp_path):
+    for g in random_grids(10):
+        field = DistanceField.build(g, move_cost=1)
+        path = str(tmp_path / "field.dfld")
+        field.save(path)
+        loaded = DistanceField.load(path)
+        assert (loaded.width, loaded.height, loaded.goal, loaded.move_cost) == (
+            field.width,
+            field.height,
+            field.goal,
+            field.move_cost,
+        )
+        assert loaded.distances == field.distances
+        assert loaded.next_hops == field.next_hops
+
+
+def test_rejects_bad_data():
+    data = DistanceField.build(next(random_grids(1))).to_bytes()
+    with pytest.raises(ValueError):
+        DistanceField.from_bytes(b"XXXX" + data[4:])
+    with pytest.raises(ValueError):
+        DistanceField.from_bytes(data[:-1])
@@ -0,0 +1,32 @@
+import time
+
+import solver
+from domain import Dimensions, Position
+from grid import Grid
+from grid_testing import check_path, random_grids
+
+
+def test_jps_matches_dijkstra():
+    for g in random_grids(60):
+        for move_cost in (1, 3):
+            ref = solver.solve(g, "astar", heuristic="zero", move_cost=move_cost)
+            res = solver.solve(g, "jps", move_cost=move_cost)
+            assert res.found == ref.found
+            if res.found:
+                check_path(g, res.path)
+                assert res.cost == ref.cost
+
+
+def test_jumps_on_open_floor_cost_their_length():
+    # Each jump scans whole rows at once, so crossing a large open map
+    # takes about as many steps as the path is long, not width * height.
+    g = Grid(Dimensions(1000, 1000), Position(500, 500), Position(503, 502), [])
+    began = time.perf_counter()
+    res = solver.solve(g, "jps")
+    assert time.perf_counter() - began < 1
+    assert len(res.path) == 6
+    g = Grid(Dimensions(1000, 1000), Position(5, 5), Position(990, 990), [])
+    began = time.perf_counter()
+    res = solver.solve(g, "jps")
+    assert time.perf_counter() - began < 2
+    assert len(res.path) == 1971
@@ -0,0 +1,28 @@
+import random
+
+import solver
+from domain import Position
+from lpa_agent import new_lpa_agent
+from grid_testing import check_path, random_grids
+
+
+def test_replan_matches_fresh_search_after_edits():
+    for seed, g in enumerate(random_grids(40)):
+        r = random.Random(seed)
+        move_cost = 1 + seed % 2
+        agent = new_lpa_agent(move_cost)
+        agent.set_grid(g)
+        for _ in range(15):
+            agent.replan()
+            ref = solver.solve(g, "astar", heuristic="zero", move_cost=move_cost)
+            assert agent.found_goal() == ref.found
+            if ref.found:
+                path = list(reversed(agent.optimal_path())) + [g.goal()]
+                check_path(g, path)
+                assert solver.path_cost(g, path, move_cost) == ref.cost
+            pos = Position(r.randrange(g.width()), r.randrange(g.height()))
+            if r.random() < 0.5 and pos not in (g.start(), g.goal()):
+                g.set_wall(pos, not g.is_wall(pos))
+            else:
+                g.set_el(pos, r.randint(0, 5))
+        agent.detach()
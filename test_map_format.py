@@ -0,0 +1,58 @@
+import pytest
+
+import solver
+from domain import Position
+from grid_testing import random_grids
+from map_format import import_movingai_map, load_map, open_grid, save_map
+
+
+def test_save_load_round_trip(tmp_path):
+    path = str(tmp_path / "grid.gmap")
+    for g in random_grids(20):
+        save_map(g, path)
+        loaded = load_map(path)
+        assert (loaded.width(), loaded.height()) == (g.width(), g.height())
+        assert (loaded.start(), loaded.goal()) == (g.start(), g.goal())
+        assert bytes(loaded.wall_plane()) == bytes(g.wall_plane())
+        assert bytes(loaded.el_plane()) == bytes(g.el_plane())
+        assert solver.solve(loaded, "ufs").path == solver.solve(g, "ufs").path
+
+
+def test_loaded_edits_stay_in_memory(tmp_path):
+    path = str(tmp_path / "grid.gmap")
+    g = next(random_grids(1))
+    save_map(g, path)
+    loaded = load_map(path)
+    pos = Position(0, 0) if g.start() != Position(0, 0) else Position(1, 0)
+    loaded.set_el(pos, 5)
+    assert loaded.get_el(pos) == 5
+    assert bytes(load_map(path).el_plane()) == bytes(g.el_plane())
+
+
+def test_rejects_bad_map_files(tmp_path):
+    path = tmp_path / "grid.gmap"
+    save_map(next(random_grids(1)), str(path))
+    data = path.read_bytes()
+    path.write_bytes(data[:-1])
+    with pytest.raises(ValueError):
+        load_map(str(path))
+    path.write_bytes(b"XXXX" + data[4:])
+    with pytest.raises(ValueError):
+        load_map(str(path))
+
+
+def test_import_movingai_map(tmp_path):
+    path = tmp_path / "tiny.map"
+    path.write_text("type octile\nheight 3\nwidth 4\nmap\n..@.\n.T..\nS.W.\n")
+    g = import_movingai_map(str(path))
+    assert (g.width(), g.height()) == (4, 3)
+    assert (g.start(), g.goal()) == (Position(0, 0), Position(3, 2))
+    walls = {(pos.x_coord, pos.y_coord) for pos in g.walls()}
+    assert walls == {(2, 0), (1, 1), (2, 2)}
+    assert open_grid(str(path)).walls() == g.walls()
+    path.write_text("type octile\nheight 2\nwidth 4\nmap\n....\n")
+    with pytest.raises(ValueError):
+        import_movingai_map(str(path))
+    path.write_text("type octile\nheight 1\nwidth 2\nmap\n.X\n")
+    with pytest.raises(ValueError):
+        import_movingai_map(str(path))
@@ -0,0 +1,59 @@
+import random
+
+import solver
+from domain import Position
+from grid_testing import random_grids
+from path_cache import PathCache
+
+
+def random_open(g, r: random.Random) -> Position:
+    while True:
+        pos = Position(r.randrange(g.width()), r.randrange(g.height()))
+        if not g.is_wall(pos):
+            return pos
+
+
+def test_repeated_queries_hit():
+    g = next(random_grids(1))
+    cache = PathCache(g)
+    first = cache.solve("astar", heuristic="octile")
+    assert cache.solve("astar", heuristic="octile") is first
+    cache.solve("astar")
+    cache.solve("bfs")
+    assert (cache.hits, cache.misses, len(cache)) == (1, 3, 3)
+
+
+def test_edits_invalidate():
+    for seed, g in enumerate(random_grids(30)):
+        r = random.Random(seed)
+        cache = PathCache(g)
+        queries = [(random_open(g, r), random_open(g, r)) for _ in range(4)]
+        for _ in range(5):
+            for start, goal in queries:
+                if g.is_wall(start) or g.is_wall(goal):
+                    continue
+                res = cache.solve("ufs", start, goal)
+                ref = solver.solve(g, "ufs", start=start, goal=goal)
+                assert (res.found, res.path) == (ref.found, ref.path)
+            pos = Position(r.randrange(g.width()), r.randrange(g.height()))
+            if pos in (g.start(), g.goal()):
+                continue
+            version = g.version()
+            g.set_wall(pos, not g.is_wall(pos))
+            assert g.version() != version
+        assert cache.invalidations > 0
+
+
+def test_evicts_least_recently_used():
+    g = next(random_grids(1))
+    cache = PathCache(g, max_entries=2)
+    cache.solve("bfs")
+    cache.solve("dfs")
+    cache.solve("bfs")
+    cache.solve("ufs")
+    assert cache.evictions == 1
+    hits = cache.hits
+    cache.solve("bfs")
+    assert cache.hits == hits + 1
+    cache.solve("dfs")
+    assert cache.misses == 4
@@ -0,0 +1,131 @@
+import asyncio
+import json
+
+import pytest
+
+import grid
+import solver
+from domain import Position
+from planner_service import Planner, PlannerOverloaded, serve
+
+
+def rooms():
+    return grid.generate_random(60, 60, 2, "rooms")
+
+
+def test_identical_requests_share_one_search():
+    g = rooms()
+
+    async def main():
+        planner = Planner(g, workers=2)
+        try:
+            results = await asyncio.gather(*[planner.plan() for _ in range(5)])
+            return results, planner.stats()
+        finally:
+            planner.close()
+
+    results, stats = asyncio.run(main())
+    assert all(result is results[0] for result in results)
+    assert results[0].cost == solver.solve(g, "ufs").cost
+    assert (stats["requests"], stats["coalesced"]) == (5, 4)
+    assert stats["in_flight"] == stats["queued"] == 0
+
+
+def test_full_queue_rejects():
+    g = rooms()
+
+    async def main():
+        planner = Planner(g, workers=1, max_in_flight=1, max_queued=2)
+        try:
+            results = await asyncio.gather(
+                *[planner.plan(agent="bfs", max_expansions=n) for n in range(10)],
+                return_exceptions=True,
+            )
+            return results, planner.stats()
+        finally:
+            planner.close()
+
+    results, stats = asyncio.run(main())
+    rejected = [result for result in results if isinstance(result, PlannerOverloaded)]
+    assert len(rejected) == stats["rejected"] == 8
+
+
+def test_cancelled_caller_leaves_others_waiting():
+    g = rooms()
+
+    async def main():
+        planner = Planner(g, workers=1)
+        try:
+            first = asyncio.create_task(planner.plan(agent="dfs"))
+            second = asyncio.create_task(planner.plan(agent="dfs"))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+        finally:
+            planner.close()
+
+    assert asyncio.run(main()).found
+
+
+async def exchange(planner: Planner, lines: list[bytes], path: str | None = None):
+    """Send request lines to a fresh server and collect the replies by id."""
+    server = await serve(planner, path=path)
+    try:
+        if path is None:
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        else:
+            reader, writer = await asyncio.open_unix_connection(path)
+        writer.write(b"".join(lines))
+        await writer.drain()
+        replies = [json.loads(await reader.readline()) for _ in lines]
+        writer.close()
+        await writer.wait_closed()
+    finally:
+        server.close()
+        await server.wait_closed()
+    return {reply["id"]: reply for reply in replies}
+
+
+REQUESTS = [
+    b'{"id": 1, "agent": "astar", "options": {"heuristic": "octile"}}\n',
+    b'{"id": 2, "agent": "nope"}\n',
+    b'{"id": 3, "start": [-1, 0]}\n',
+    b'{"id": 4, "options": {"queue": "buckets"}}\n',
+    b"not json\n",
+]
+
+
+def check_replies(g, replies: dict):
+    assert replies[1]["cost"] == solver.solve(g, "astar", heuristic="octile").cost
+    assert "error" in replies[2] and "error" in replies[3]
+    assert replies[4]["cost"] == solver.solve(g, "ufs").cost
+    assert "error" in replies[None]
+
+
+def test_tcp_server():
+    g = rooms()
+
+    async def main():
+        planner = Planner(g, workers=2)
+        try:
+            return await exchange(planner, REQUESTS)
+        finally:
+            planner.close()
+
+    check_replies(g, asyncio.run(main()))
+
+
+def test_unix_server(tmp_path):
+    if not hasattr(asyncio, "open_unix_connection"):
+        pytest.skip("no Unix sockets on this platform")
+    g = rooms()
+
+    async def main():
+        planner = Planner(g, workers=2)
+        try:
+            return await exchange(planner, REQUESTS, str(tmp_path / "plan.sock"))
+        finally:
+            planner.close()
+
+    check_replies(g, asyncio.run(main()))
@@ -0,0 +1,82 @@
+import random
+import tracemalloc
+
+import grid
+import solver
+from grid_testing import random_grids
+from search_core import BitFlags, CellFlags, DirectionParents
+
+AGENTS = ("bfs", "dfs", "ufs", "astar", "bibfs", "biufs", "jps")
+
+
+def test_bit_flags_match_cell_flags():
+    for seed in range(300):
+        r = random.Random(seed)
+        size = r.randint(1, 80)
+        plain, packed = CellFlags(size), BitFlags(size)
+        for _ in range(10):
+            first = r.randrange(size)
+            end = r.randint(first, size)
+            choice = r.random()
+            for flags in (plain, packed):
+                if choice < 0.4:
+                    flags.add(first)
+                elif choice < 0.6:
+                    flags.discard(first)
+                else:
+                    flags.add_range(first, end)
+            assert list(plain) == list(packed)
+            assert len(plain) == len(packed) == len(list(plain))
+            assert packed.any_between(first, end) == any(
+                cell in plain for cell in range(first, end)
+            )
+
+
+def test_direction_parents_round_trip():
+    width, height = 7, 5
+    parents = DirectionParents(width * height, width)
+    expected = {}
+    for cell in range(width * height):
+        x, y = cell % width, cell // width
+        options = [
+            cell + dy * width + dx
+            for dx, dy in ((0, -1), (0, 1), (-1, 0), (1, 0))
+            if 0 <= x + dx < width and 0 <= y + dy < height
+        ]
+        expected[cell] = random.Random(cell).choice(options)
+        parents[cell] = expected[cell]
+    assert all(parents[cell] == parent for cell, parent in expected.items())
+
+
+def test_compact_search_matches_plain():
+    for g in random_grids(40):
+        for agent_type in AGENTS:
+            plain = solver.solve(g, agent_type, instrument=True)
+            packed = solver.solve(g, agent_type, instrument=True, compact=True)
+            assert (plain.found, plain.path, plain.cost, plain.expansions) == (
+                packed.found,
+                packed.path,
+                packed.cost,
+                packed.expansions,
+            )
+            assert plain.metrics.expansions == packed.metrics.expansions
+
+
+def test_compact_state_is_packed():
+    g = grid.generate_random(500, 500, 1, "open")
+    cells = g.width() * g.height()
+    for agent_type in AGENTS:
+        used = []
+        for compact in (False, True):
+            agent = solver.new_agent(agent_type)
+            if compact:
+                agent.compact()
+            tracemalloc.start()
+            agent.set_grid(g)
+            used.append(tracemalloc.get_traced_memory()[0] / cells)
+            tracemalloc.stop()
+        plain, packed = used
+        # Flags at one bit and parents at two bits per cell, a handful of
+        # tables per agent; the plain tables take a byte or four each.
+        assert packed <= 1.1, agent_type
+        assert packed * 5 < plain, agent_type
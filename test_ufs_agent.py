@@ -0,0 +1,43 @@
+import heapq
+import random
+
+import pytest
+
+import solver
+from grid_testing import check_path, random_grids
+from search_core import BucketQueue
+
+
+def test_bucket_queue_pops_in_heap_order():
+    for seed in range(50):
+        r = random.Random(seed)
+        buckets, heap = BucketQueue(), []
+        counter = cost = 0
+        for _ in range(500):
+            if heap and r.random() < 0.45:
+                entry = heapq.heappop(heap)
+                assert buckets.pop() == entry
+                cost = entry[0]
+            else:
+                counter += 1
+                entry = (cost + r.randint(0, 255), counter, r.randrange(1000))
+                heapq.heappush(heap, entry)
+                buckets.push(entry)
+            assert len(buckets) == len(heap)
+    with pytest.raises(IndexError):
+        BucketQueue().pop()
+
+
+def test_buckets_find_the_heap_paths():
+    for g in random_grids(60):
+        heap = solver.solve(g, "ufs", instrument=True)
+        buckets = solver.solve(g, "ufs", instrument=True, queue="buckets")
+        assert (heap.found, heap.path, heap.cost, heap.expansions) == (
+            buckets.found,
+            buckets.path,
+            buckets.cost,
+            buckets.expansions,
+        )
+        assert heap.metrics.pushes == buckets.metrics.pushes
+        if heap.found:
+            check_path(g, heap.path)
@@ -0,0 +1,32 @@
+import pytest
+
+import solver
+from grid_testing import check_path, random_grids
+
+np = pytest.importorskip("numpy")
+
+
+def test_wavefront_matches_bfs():
+    for g in random_grids(60):
+        ref = solver.solve(g, "bfs")
+        res = solver.solve(g, "wavefront")
+        assert res.found == ref.found
+        if res.found:
+            check_path(g, res.path)
+            assert len(res.path) == len(ref.path)
+
+
+def test_distances_are_bfs_levels():
+    for g in random_grids(20):
+        agent = solver.new_agent("wavefront")
+        agent.set_grid(g)
+        agent.run()
+        distances = agent.distances()
+        for cell in np.flatnonzero(distances > 0).tolist():
+            x, y = cell % g.width(), cell // g.width()
+            neighbors = [
+                distances[(y + dy) * g.width() + x + dx]
+                for dx, dy in ((0, -1), (0, 1), (-1, 0), (1, 0))
+                if 0 <= x + dx < g.width() and 0 <= y + dy < g.height()
+            ]
+            assert distances[cell] - 1 in neighbors
@@ -1,92 +1,183 @@
 from collections import deque
+from functools import partial
 from domain import IAgent, Position, IGrid, directions
 import heapq
+from search_core import BucketQueue, CellView, SearchCore
 from utils import translate
 
+QUEUES = ("heap", "buckets")
+"""Priority queue backends: a binary heap, or Dial's `BucketQueue`"""
 
-def new_ufs_agent() -> IAgent:
-    return UfsAgent()
+
+def new_ufs_agent(queue: str = "heap") -> IAgent:
+    return UfsAgent(queue)
 
 
 class UfsAgent(IAgent):
-    def __init__(self) -> None:
-        self._visited: set[Position] = set()
-        """For tracking positions already visited"""
-        self._prty_queue = []
-        """Priority queue that uses relative elevation of a position to determine cost"""
-        self._pri_set: set = set()
-        """For tracking positions already added to the queue"""
+    """Uniform-cost search where entering a cell costs its elevation.
+
+    The frontier is a priority queue of (cumulative cost, counter, cell)
+    entries, either a binary heap (`queue="heap"`) or Dial's bucket queue
+    (`queue="buckets"`), which is O(1) per operation because elevations are
+    small integers. Both pop in (cost, counter) order, so they expand the
+    same cells and find the same path.
+    """
+
+    def __init__(self, queue: str = "heap") -> None:
+        if queue == "heap":
+            self._prty_queue: list | BucketQueue = []
+            self._push = partial(heapq.heappush, self._prty_queue)
+            self._pop = partial(heapq.heappop, self._prty_queue)
+        elif queue == "buckets":
+            self._prty_queue = BucketQueue()
+            self._push = self._prty_queue.push
+            self._pop = self._prty_queue.pop
+        else:
+            raise ValueError(f"Unknown queue {queue!r}, expected one of {QUEUES}")
         self._cost = 0
         """Cumulative cost tracker"""
-        self._neighbors: list[Position] = []
-        """Current neighbors"""
         self._optimal_path: list[Position] = []
         """Cheapest path"""
         self._counter = 0
         """For acting as a tie-breaker for the priority queue, ensuring it uses insertion order when costs are equal"""
-        self._seen: set[Position] = set()
-        """To register a cell as having been 'seen' by the agent so that it can be rendered on the screen, simulating known vs. unknown territory"""
-        self.parents: dict[Position, Position] = {}
-        """For reconstructing optimal path once the goal is reached"""
+        self._finished = False
+        self._found_goal = False
 
     def next(self):
-        if len(self._prty_queue) > 0:
-            self._cost, _, self._current = heapq.heappop(self._prty_queue)
-            self._visited.add(self._current)
-        if self._current == self._grid.goal():
+        if self._finished:
+            return
+        if len(self._prty_queue) == 0:
+            self._finished = True
+            return
+        self._cost, _, self._current = self._pop()
+        if self._metrics is not None:
+            self._metrics.pop()
+        self._core.visited.add(self._current)
+        if self._current == self._core.goal:
             self._find_optimal()
+            self._finished = True
+            self._found_goal = True
             self._grid.set_finished()
         else:
             self._add_neighbors()
 
+    def run(self, max_expansions: int | None = None) -> int:
+        """`next()` unrolled into one loop over the raw planes."""
+        if self._metrics is not None or self._finished or self._core.compact:
+            return super().run(max_expansions)
+        core = self._core
+        width, size, goal = core.width, core.size, core.goal
+        steps_to, walls, els, parents = core.steps, core.walls, core.els, core.parents
+        visited, seen = core.visited.flags, core.seen.flags
+        queued = self._pri_set.flags
+        queue, push, pop = self._prty_queue, self._push, self._pop
+        newly_seen = newly_visited = newly_queued = 0
+        counter = self._counter
+        cost, cell = self._cost, self._current
+        limit = -1 if max_expansions is None else max_expansions
+        steps = 0
+        while steps != limit:
+            steps += 1
+            if not queue:
+                self._finished = True
+                break
+            cost, _, cell = pop()
+            if not visited[cell]:
+                visited[cell] = 1
+                newly_visited += 1
+            if cell == goal:
+                self._current = cell
+                self._find_optimal()
+                self._finished = True
+                self._found_goal = True
+                self._grid.set_finished()
+                break
+            x = cell % width
+            for dx, offset in steps_to:
+                neighbor = cell + offset
+                if dx:
+                    if not 0 <= x + dx < width:
+                        continue
+                elif not 0 <= neighbor < size:
+                    continue
+                if not seen[neighbor]:
+                    seen[neighbor] = 1
+                    newly_seen += 1
+                if not (visited[neighbor] or walls[neighbor] or queued[neighbor]):
+                    parents[neighbor] = cell
+                    queued[neighbor] = 1
+                    newly_queued += 1
+                    counter += 1
+                    push((cost + els[neighbor], counter, neighbor))
+        self._cost, self._current, self._counter = cost, cell, counter
+        core.seen.count += newly_seen
+        core.visited.count += newly_visited
+        self._pri_set.count += newly_queued
+        return steps
+
+    def is_finished(self) -> bool:
+        return self._finished
+
+    def found_goal(self) -> bool:
+        return self._found_goal
+
     def set_grid(self, grid: IGrid):
         self._grid = grid
-        self._current: Position = grid.start()
+        self._core = SearchCore(grid, self._compact)
+        """Visited/seen flags and parent table, keyed by flat cell id"""
+        self._pri_set = self._core.new_flags()
+        """For tracking positions already added to the queue"""
+        self._current = self._core.start
+        self._pri_set.add(self._current)
+        self._push((0, self._counter, self._current))
+        if self._metrics is not None:
+            self._metrics.push()
 
-    def visited(self) -> set[Position]:
-        return self._visited
+    def visited(self) -> CellView:
+        return CellView(self._core, self._core.visited)
 
     def position(self) -> Position:
-        return self._current
+        return self._core.position(self._current)
 
-    def to_explore(self):
-        positions_queue = deque(position for _, _, position in self._prty_queue)
-        return positions_queue
+    def to_explore(self) -> CellView:
+        positions_queue = deque(cell for _, _, cell in self._prty_queue)
+        return CellView(self._core, positions_queue)
 
     def neighbors(self) -> list[Position]:
-        return self._neighbors
+        return [translate(self.position(), direction) for direction in directions]
 
-    def _push_to_queue(self, neighbor: Position):
+    def _push_to_queue(self, neighbor: int):
         self._pri_set.add(neighbor)
-        neighbor_el = self._grid.get_el(neighbor)
+        neighbor_el = self._core.els[neighbor]
         cumulative_cost = self._cost + neighbor_el
         self._counter += 1
-        heapq.heappush(self._prty_queue, (cumulative_cost, self._counter, neighbor))
+        self._push((cumulative_cost, self._counter, neighbor))
+        if self._metrics is not None:
+            self._metrics.push()
 
-    def seen(self) -> set[Position]:
-        return self._seen
+    def seen(self) -> CellView:
+        return CellView(self._core, self._core.seen)
 
     def _add_neighbors(self):
-        print(f"add neighbors called:")
-        self._neighbors.clear()
-        for direction in directions:
-            neighbor = translate(self._current, direction)
-            self._seen.add(neighbor)
-            self._neighbors.append(neighbor)
-            is_visited = neighbor in self._visited
-            is_valid = self._grid.is_valid(neighbor)
+        seen = self._core.seen
+        parents = self._core.parents
+        metrics = self._metrics
+        neighbors = self._core.neighbors(self._current)
+        if metrics is not None:
+            self._core.expanded(metrics, self._current, neighbors)
+        for neighbor in neighbors:
+            seen.add(neighbor)
+            is_visited = neighbor in self._core.visited
+            is_valid = self._core.is_open(neighbor)
             in_set = neighbor in self._pri_set
             if (not is_visited) and is_valid and (not in_set):
-                self.parents[neighbor] = self._current
+                parents[neighbor] = self._current
                 self._push_to_queue(neighbor)
+            elif metrics is not None:
+                self._core.rejected(metrics, neighbor)
 
     def _find_optimal(self):
-        finished = False
-        while not finished:
-            self._optimal_path.append(self.parents[self._current])
-            self._current = self.parents[self._current]
-            if self._current == self._grid.start():
-                finished = True
+        self._optimal_path = self._core.path_to(self._current)
 
     def optimal_path(self) -> list[Position]:
         return self._optimal_path
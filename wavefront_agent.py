@@ -0,0 +1,167 @@
+from collections.abc import Iterator
+
+from domain import IAgent, Position, IGrid, directions
+from search_core import CellLayout, CellView
+from utils import translate
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def new_wavefront_agent() -> IAgent:
+    return WavefrontAgent()
+
+
+class WavefrontAgent(IAgent):
+    """Breadth-first search one whole level per `next()` call, in NumPy.
+
+    The frontier is an array of cell ids. Each step offsets it in the four
+    directions at once, keeps the open cells that have no distance yet and
+    gives them the next level's distance. Once the goal has a distance the
+    path is read back by stepping from the goal to any neighbor one level
+    closer, so it is as short as BfsAgent's, though on ties it may take a
+    different route. All costs are one step; elevation is ignored.
+
+    Needs NumPy, which the rest of the package does not.
+    """
+
+    def __init__(self) -> None:
+        if np is None:
+            raise ImportError("WavefrontAgent needs numpy installed.")
+        self._optimal_path: list[Position] = []
+        self._level = 0
+        self._finished = False
+        self._found_goal = False
+
+    def set_grid(self, grid: IGrid):
+        self._grid = grid
+        self._core = CellLayout(grid)
+        self._walls = np.frombuffer(grid.wall_plane(), dtype=np.uint8)
+        self._distances = np.full(self._core.size, -1, dtype=np.int32)
+        """Steps from the start per cell, -1 until reached"""
+        self._distances[self._core.start] = 0
+        self._reached = 1
+        self._frontier = np.array([self._core.start], dtype=np.int64)
+        """Cells at distance `_level`"""
+
+    def next(self):
+        if self._finished:
+            return
+        core = self._core
+        width = core.width
+        frontier = self._frontier
+        x = frontier % width
+        candidates = np.concatenate(
+            (
+                frontier - width,
+                frontier + width,
+                frontier[x > 0] - 1,
+                frontier[x < width - 1] + 1,
+            )
+        )
+        in_bounds = (candidates >= 0) & (candidates < core.size)
+        candidates = candidates[in_bounds]
+        distances = self._distances
+        open_cells = self._walls[candidates] == 0
+        fresh = (distances[candidates] == -1) & open_cells
+        candidates = candidates[fresh]
+        # Cells reached from two sides appear twice. Tag each one with the
+        # index of its last appearance and keep only that one, which
+        # deduplicates without sorting.
+        tags = np.arange(len(candidates), dtype=np.int32)
+        distances[candidates] = -2 - tags
+        frontier = candidates[distances[candidates] == -2 - tags]
+        self._level += 1
+        distances[frontier] = self._level
+        self._reached += len(frontier)
+        if self._metrics is not None:
+            self._count(in_bounds, open_cells, fresh, frontier)
+        self._frontier = frontier
+        if self._distances[core.goal] >= 0:
+            self._optimal_path = [core.position(cell) for cell in self._walk_back()]
+            self._finished = True
+            self._found_goal = True
+            self._grid.set_finished()
+        elif len(frontier) == 0:
+            self._finished = True
+
+    def _count(self, in_bounds, open_cells, fresh, frontier):
+        metrics = self._metrics
+        expanded = self._frontier
+        metrics.expansions += len(expanded)
+        metrics.pops += len(expanded)
+        metrics.pushes += len(frontier)
+        metrics.frontier = len(frontier)
+        metrics.frontier_peak = max(metrics.frontier_peak, len(frontier))
+        metrics.rejected_bounds += 4 * len(expanded) - int(in_bounds.sum())
+        metrics.rejected_wall += len(open_cells) - int(open_cells.sum())
+        metrics.rejected_visited += int(open_cells.sum()) - int(fresh.sum())
+        # Neighbors already given this level's distance were queued by
+        # another cell of the same frontier.
+        metrics.rejected_queued += int(fresh.sum()) - len(frontier)
+        if metrics.on_expand is not None:
+            for cell in expanded.tolist():
+                metrics.on_expand(self._core.position(cell))
+
+    def _walk_back(self) -> list[int]:
+        core = self._core
+        distances = self._distances
+        path = []
+        cell = core.goal
+        while cell != core.start:
+            closer = distances[cell] - 1
+            cell = next(n for n in core.neighbors(cell) if distances[n] == closer)
+            path.append(cell)
+        return path
+
+    def distances(self):
+        """Steps from the start per cell (row-major, -1 where not reached),
+        as a NumPy array shared with the agent."""
+        return self._distances
+
+    def is_finished(self) -> bool:
+        return self._finished
+
+    def found_goal(self) -> bool:
+        return self._found_goal
+
+    def visited(self) -> CellView:
+        return CellView(self._core, _Reached(self._distances, self._reached))
+
+    def seen(self) -> CellView:
+        return self.visited()
+
+    def to_explore(self) -> CellView:
+        return CellView(self._core, self._frontier.tolist())
+
+    def position(self) -> Position:
+        if self._found_goal:
+            return self._core.position(self._core.goal)
+        if len(self._frontier):
+            return self._core.position(int(self._frontier[0]))
+        return self._core.position(self._core.start)
+
+    def neighbors(self) -> list[Position]:
+        return [translate(self.position(), direction) for direction in directions]
+
+    def optimal_path(self) -> list[Position]:
+        return self._optimal_path
+
+
+class _Reached:
+    """Cells with a distance, as a read-only container of cell ids."""
+
+    def __init__(self, distances, count: int) -> None:
+        self._distances = distances
+        self._count = count
+
+    def __contains__(self, cell: object) -> bool:
+        return bool(self._distances[cell] >= 0)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(np.flatnonzero(self._distances >= 0).tolist())
+
+    def __len__(self) -> int:
+        return self._count